@@ -0,0 +1,197 @@
+"""Before/after benchmark for ops API response serialization (no database needed).
+
+Builds synthetic ops_jobs rows shaped like real ones and times, per request:
+
+- list_200: `GET /ops/jobs?limit=200`. Before: ORM rows with decoded JSONB
+  payload/result, dict building, `jsonable_encoder` + stdlib json (FastAPI default
+  for `response_model=dict`). After: summary columns only + orjson.
+- detail_200: 200 `GET /ops/jobs/{id}` responses. Before: decoded JSONB re-encoded
+  through `jsonable_encoder` + json. After: JSONB text embedded via `orjson.Fragment`.
+- runner_result: runner result serialization. Before: `json.dumps` to measure size,
+  then again as the driver parameter. After: a single `orjson.dumps`.
+
+Usage:
+    python -m benchmarks.bench_serialization --rows 200 --repeat 50 --output bench_serialization.json
+
+The JSONB decode the driver performs on the "before" path is included (json.loads of
+the stored text), since the old endpoints fetched full rows.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from benchmarks.bench_e2e import summarize
+from domain_expansion.app.responses import OrjsonResponse, raw_json
+
+JOB_TYPES = ("nearsight_collect_refresh", "captorator_compose", "metrics_refresh", "captorator_asset_qc")
+
+
+def make_rows(count: int, result_bytes: int, seed: int = 7) -> list[dict]:
+    """Rows as the database returns them: JSONB columns as text."""
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    rows = []
+    for i in range(count):
+        items = [
+            {"id": rng.randrange(10**9), "title": f"item {j}", "score": rng.random(), "tags": ["a", "b"]}
+            for j in range(max(1, result_bytes // 80))
+        ]
+        rows.append(
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "job_type": JOB_TYPES[i % len(JOB_TYPES)],
+                "status": "succeeded",
+                "requested_by": "bench",
+                "created_at": now - timedelta(seconds=i),
+                "updated_at": now - timedelta(seconds=i) + timedelta(milliseconds=350),
+                "payload": json.dumps({"limit": 50, "sources": ["a", "b", "c"], "brand": "x" * 20}),
+                "result": json.dumps({"status": "ok", "items": items, "wall_ms": rng.random() * 100}),
+                "error": None,
+                "runner_instance": "default",
+            }
+        )
+    return rows
+
+
+def _summary_dict(row: dict) -> dict:
+    return {
+        "id": str(row["id"]),
+        "job_type": row["job_type"],
+        "status": row["status"],
+        "requested_by": row["requested_by"],
+        "created_at": row["created_at"].isoformat(),
+        "updated_at": row["updated_at"].isoformat(),
+    }
+
+
+def _stdlib_render(content: dict) -> bytes:
+    # Starlette JSONResponse.render after FastAPI's jsonable_encoder
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def list_before(rows: list[dict]) -> bytes:
+    loaded = [{**r, "payload": json.loads(r["payload"]), "result": json.loads(r["result"])} for r in rows]
+    return _stdlib_render({"jobs": [_summary_dict(r) for r in loaded], "count": len(loaded)})
+
+
+def list_after(rows: list[dict]) -> bytes:
+    summaries = [
+        {k: r[k] for k in ("id", "job_type", "status", "requested_by", "created_at", "updated_at")}
+        for r in rows
+    ]
+    return OrjsonResponse({"jobs": summaries, "count": len(summaries)}).body
+
+
+def detail_before(rows: list[dict]) -> int:
+    total = 0
+    for r in rows:
+        body = {
+            **_summary_dict(r),
+            "payload": json.loads(r["payload"]),
+            "result": json.loads(r["result"]),
+            "error": r["error"],
+            "runner_instance": r["runner_instance"],
+        }
+        total += len(_stdlib_render(body))
+    return total
+
+
+def detail_after(rows: list[dict]) -> int:
+    total = 0
+    for r in rows:
+        body = {**r, "payload": raw_json(r["payload"]), "result": raw_json(r["result"])}
+        total += len(OrjsonResponse(body).body)
+    return total
+
+
+def runner_before(results: list[dict]) -> int:
+    total = 0
+    for result in results:
+        size = len(json.dumps(result))
+        total += len(json.dumps(result)) if size <= 10000 else 0
+    return total
+
+
+def runner_after(results: list[dict]) -> int:
+    total = 0
+    for result in results:
+        encoded = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+        total += len(encoded.decode()) if len(encoded) <= 10000 else 0
+    return total
+
+
+def _time(fn, arg, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(round((time.perf_counter() - start) * 1000, 4))
+    return samples
+
+
+def run(args: argparse.Namespace) -> dict:
+    rows = make_rows(args.rows, args.result_bytes)
+    results = [json.loads(r["result"]) for r in rows]
+
+    # Same semantic content on both paths (modulo datetime formatting of the encoder)
+    before, after = json.loads(list_before(rows)), json.loads(list_after(rows))
+    assert [j["id"] for j in before["jobs"]] == [j["id"] for j in after["jobs"]]
+    assert json.loads(OrjsonResponse({"r": raw_json(rows[0]["result"])}).body)["r"] == results[0]
+
+    cases = {
+        "list_200": (list_before, list_after, rows),
+        "detail_200": (detail_before, detail_after, rows),
+        "runner_result": (runner_before, runner_after, results),
+    }
+    report = {}
+    for name, (old, new, arg) in cases.items():
+        old(arg), new(arg)  # warm up
+        before_ms = summarize(_time(old, arg, args.repeat))
+        after_ms = summarize(_time(new, arg, args.repeat))
+        report[name] = {
+            "before_ms": before_ms,
+            "after_ms": after_ms,
+            "speedup_p50": round(before_ms["p50"] / after_ms["p50"], 2) if after_ms["p50"] else None,
+        }
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "orjson": orjson.__version__,
+        "config": {"rows": args.rows, "result_bytes": args.result_bytes, "repeat": args.repeat},
+        "cases": report,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--result-bytes", type=int, default=2000, help="Approximate result JSON size per row")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    rendered = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(rendered + "\n")
+    else:
+        print(rendered)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,6 +3,7 @@
 Split by domain as files are added (auth.py, ops.py, metrics.py, nearsight.py, etc.).
 """
 
-from domain_expansion.app.models.ops import OpsJob, OpsJobEvent, JobStatus
+from domain_expansion.app.models.nearsight import NearsightArticle
+from domain_expansion.app.models.ops import OpsJob, OpsJobEvent, OpsSchedule, JobStatus
 
-__all__ = ["OpsJob", "OpsJobEvent", "JobStatus"]
+__all__ = ["NearsightArticle", "OpsJob", "OpsJobEvent", "OpsSchedule", "JobStatus"]
@@ -0,0 +1,48 @@
+"""Nearsight article models."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Float, Index, Text, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from domain_expansion.app.db.base import Base
+
+
+class NearsightArticle(Base):
+    """Feed article collected by the runner's nearsight_collect_refresh job.
+
+    Upserted by url_hash (sha256 of the canonical URL), so an article seen again in a
+    later refresh updates title/summary/score and last_seen_at instead of duplicating.
+    """
+
+    __tablename__ = "nearsight_articles"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
+    url_hash: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    title: Mapped[str] = mapped_column(Text, nullable=False)
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Feed URL the article was collected from
+    source: Mapped[str | None] = mapped_column(Text, nullable=True)
+    published_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0, server_default=text("0"))
+    first_seen_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow, server_default=text("now()"), nullable=False
+    )
+    last_seen_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow, server_default=text("now()"), nullable=False
+    )
+
+    __table_args__ = (
+        Index("idx_nearsight_articles_score_published", "score", "published_at"),
+        Index("idx_nearsight_articles_last_seen", "last_seen_at"),
+    )
@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import JSON, Index, Text, text
+from sqlalchemy import JSON, Boolean, Index, Integer, Text, text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -54,10 +54,13 @@ class OpsJob(Base):
     result: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
     error: Mapped[str | None] = mapped_column(Text, nullable=True)
     runner_instance: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # sha256 of (job_type, canonical payload); only set when result reuse is enabled for job_type
+    payload_hash: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     __table_args__ = (
         Index("idx_ops_jobs_status_created", "status", "created_at"),
         Index("idx_ops_jobs_type_created", "job_type", "created_at"),
+        Index("idx_ops_jobs_type_hash_created", "job_type", "payload_hash", "created_at"),
     )
 
 
@@ -84,3 +87,56 @@ class OpsJobEvent(Base):
     created_at: Mapped[datetime] = mapped_column(
         default=datetime.utcnow, server_default=text("now()"), nullable=False, index=True
     )
+
+
+class OpsSchedule(Base):
+    """Recurring runner job schedule.
+
+    Evaluated by the runner scheduler (SCHEDULER_ENABLED=true on the runner).
+    Due rows are claimed with FOR UPDATE SKIP LOCKED so only one runner fires each tick.
+    overlap_policy: "skip" drops a tick while the previous run is active,
+    "coalesce" defers it and runs once when the previous run finishes.
+    """
+
+    __tablename__ = "ops_schedules"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
+    name: Mapped[str] = mapped_column(Text, nullable=False, unique=True)
+    job_type: Mapped[str] = mapped_column(Text, nullable=False)
+    cron: Mapped[str] = mapped_column(Text, nullable=False)
+    payload: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+    enabled: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=True, server_default=text("true")
+    )
+    overlap_policy: Mapped[str] = mapped_column(
+        Text, nullable=False, default="skip", server_default=text("'skip'")
+    )
+    jitter_seconds: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    # NULL until the runner computes the first fire time
+    next_run_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    last_run_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    last_job_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    skipped_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow, server_default=text("now()"), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=text("now()"),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        Index("idx_ops_schedules_enabled_next", "enabled", "next_run_at"),
+    )
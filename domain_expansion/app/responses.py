@@ -0,0 +1,24 @@
+"""JSON response rendered with orjson.
+
+Endpoints that return this directly skip FastAPI's `jsonable_encoder` pass; datetimes
+and UUIDs are serialized natively. JSONB columns read as text can be embedded
+unchanged with `orjson.Fragment`, so stored payloads/results are never decoded and
+re-encoded in Python.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class OrjsonResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def raw_json(value: str | None) -> orjson.Fragment | None:
+    """Embed already-serialized JSON (e.g. `CAST(col AS text)`) without re-encoding."""
+    return orjson.Fragment(value) if value is not None else None
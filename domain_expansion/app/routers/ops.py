@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
 
+import httpx
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import desc, text
+from sqlalchemy import Text, cast, desc, text
 from sqlalchemy.orm import Session
 
 from domain_expansion.app.dependencies import require_ops_api_key
 from domain_expansion.app.db.session import get_db
 from domain_expansion.app.integrations.runner_client import RunnerClient
-from domain_expansion.app.models.ops import JobStatus, OpsJob
+from domain_expansion.app.models.ops import JobStatus, OpsJob, OpsJobEvent, OpsSchedule
+from domain_expansion.app.responses import OrjsonResponse, raw_json
+from domain_expansion.app.services import job_reuse, job_stats
 from domain_expansion.app.settings import settings
 
 router = APIRouter(
@@ -30,6 +33,60 @@ class CreateJobRequest(BaseModel):
 class TriggerRunnerRequest(BaseModel):
     job_type: str
     payload: dict | None = None
+    # Only applies to job types listed in JOB_REUSE_TTLS; set false to force a fresh run
+    reuse: bool = True
+
+
+class ClawCommandRequest(BaseModel):
+    args: dict | None = None
+
+
+# Clawdbot commands the runner can execute (job_type = "claw.<command>")
+CLAW_COMMANDS = ("schema_drift", "index_intel", "query_audit")
+
+
+class UpsertScheduleRequest(BaseModel):
+    name: str
+    job_type: str
+    cron: str
+    payload: dict | None = None
+    enabled: bool = True
+    overlap_policy: str = "skip"
+    jitter_seconds: int = 0
+
+
+class JobSummary(BaseModel):
+    id: uuid.UUID
+    job_type: str
+    status: str
+    requested_by: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class JobListResponse(BaseModel):
+    jobs: list[JobSummary]
+    count: int
+
+
+class JobDetail(JobSummary):
+    payload: dict | None = None
+    result: dict | None = None
+    error: str | None = None
+    runner_instance: str | None = None
+
+
+# Per-instance cache for /ops/jobs/stats (Vercel instances each hold their own)
+_stats_cache = job_stats.TTLCache(settings.job_stats_cache_seconds)
+
+_SUMMARY_COLUMNS = (
+    OpsJob.id,
+    OpsJob.job_type,
+    OpsJob.status,
+    OpsJob.requested_by,
+    OpsJob.created_at,
+    OpsJob.updated_at,
+)
 
 
 # Ops Jobs endpoints
@@ -52,14 +109,14 @@ def create_job(request: CreateJobRequest, db: Session = Depends(get_db)) -> dict
     return {"job_id": str(job.id), "status": job.status.value}
 
 
-@router.get("/ops/jobs", response_model=dict)
+@router.get("/ops/jobs", response_model=JobListResponse)
 def list_jobs(
     status: JobStatus | None = None,
     job_type: str | None = None,
     limit: int = 50,
     since: datetime | None = None,
     db: Session = Depends(get_db),
-) -> dict:
+) -> OrjsonResponse:
     """List ops jobs with optional filters.
 
     V2 contract: Fast DB query only (safe for Vercel).
@@ -70,51 +127,102 @@ def list_jobs(
     if limit < 1:
         limit = 50
     
-    query = db.query(OpsJob)
+    # Summary columns only: payload/result JSONB is never fetched for listings
+    query = db.query(*_SUMMARY_COLUMNS)
     if status:
         query = query.filter(OpsJob.status == status)
     if job_type:
         query = query.filter(OpsJob.job_type == job_type)
     if since:
         query = query.filter(OpsJob.created_at >= since)
-    jobs = query.order_by(desc(OpsJob.created_at)).limit(limit).all()
-    return {
-        "jobs": [
-            {
-                "id": str(job.id),
-                "job_type": job.job_type,
-                "status": job.status.value,
-                "requested_by": job.requested_by,
-                "created_at": job.created_at.isoformat(),
-                "updated_at": job.updated_at.isoformat(),
-            }
-            for job in jobs
-        ],
-        "count": len(jobs),
-    }
+    rows = query.order_by(desc(OpsJob.created_at)).limit(limit).all()
+    return OrjsonResponse({"jobs": [row._asdict() for row in rows], "count": len(rows)})
+
+
+@router.get("/ops/jobs/reuse_stats", response_model=dict)
+def get_reuse_stats(hours: int = 24, db: Session = Depends(get_db)) -> dict:
+    """Result reuse hit rate per job_type over the last `hours` (default 24, max 168)."""
+    hours = min(max(hours, 1), 168)
+    since = datetime.utcnow() - timedelta(hours=hours)
+    return job_reuse.reuse_stats(db, since)
+
+
+@router.get("/ops/jobs/stats", response_model=dict)
+def get_job_stats(hours: int = 24, bucket_minutes: int = 60, db: Session = Depends(get_db)) -> OrjsonResponse:
+    """Queue health: counts by status/job_type and bucketed throughput/failure rate.
+
+    Window is the last `hours` (default 24, max 168). Cached in process for
+    JOB_STATS_CACHE_SECONDS.
+    """
+    hours = min(max(hours, 1), job_stats.MAX_HOURS)
+    bucket_minutes = max(bucket_minutes, 1)
+    if hours * 60 // bucket_minutes > job_stats.MAX_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Window has more than {job_stats.MAX_BUCKETS} buckets; increase bucket_minutes",
+        )
+    stats, age = _stats_cache.get_or_compute(
+        (hours, bucket_minutes), lambda: job_stats.job_stats(db, hours, bucket_minutes)
+    )
+    max_age = max(settings.job_stats_cache_seconds - int(age), 0)
+    return OrjsonResponse(
+        {**stats, "cache_age_seconds": round(age, 3)},
+        headers={"Cache-Control": f"private, max-age={max_age}"},
+    )
 
 
-@router.get("/ops/jobs/{job_id}", response_model=dict)
-def get_job(job_id: str, db: Session = Depends(get_db)) -> dict:
-    """Get a specific ops job by ID."""
+@router.get("/ops/jobs/{job_id}", response_model=JobDetail)
+def get_job(job_id: str, db: Session = Depends(get_db)) -> OrjsonResponse:
+    """Get a specific ops job by ID.
+
+    payload/result are read as JSON text and embedded as-is (no decode/re-encode).
+    """
     try:
         job_uuid = uuid.UUID(job_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid job_id format")
-    job = db.query(OpsJob).filter(OpsJob.id == job_uuid).first()
-    if not job:
+    row = (
+        db.query(
+            *_SUMMARY_COLUMNS,
+            cast(OpsJob.payload, Text).label("payload"),
+            cast(OpsJob.result, Text).label("result"),
+            OpsJob.error,
+            OpsJob.runner_instance,
+        )
+        .filter(OpsJob.id == job_uuid)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Job not found")
+    job = row._asdict()
+    job["payload"] = raw_json(job["payload"])
+    job["result"] = raw_json(job["result"])
+    return OrjsonResponse(job)
+
+
+@router.get("/ops/jobs/{job_id}/profile", response_model=dict)
+def get_job_profile(job_id: str, db: Session = Depends(get_db)) -> dict:
+    """Latest profiling summary recorded by the runner for a job.
+
+    Profiling is opt-in: payload `"_profile": true` or RUNNER_PROFILE_SAMPLE_RATES on the runner.
+    """
+    try:
+        job_uuid = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job_id format")
+    event = (
+        db.query(OpsJobEvent)
+        .filter(OpsJobEvent.job_id == job_uuid, OpsJobEvent.event_type == "profile")
+        .order_by(desc(OpsJobEvent.created_at))
+        .first()
+    )
+    if not event:
+        raise HTTPException(status_code=404, detail="No profile recorded for job")
     return {
-        "id": str(job.id),
-        "job_type": job.job_type,
-        "status": job.status.value,
-        "requested_by": job.requested_by,
-        "created_at": job.created_at.isoformat(),
-        "updated_at": job.updated_at.isoformat(),
-        "payload": job.payload,
-        "result": job.result,
-        "error": job.error,
-        "runner_instance": job.runner_instance,
+        "job_id": job_id,
+        "created_at": event.created_at.isoformat(),
+        "message": event.message,
+        "profile": event.data,
     }
 
 
@@ -142,7 +250,7 @@ def cancel_job(job_id: str, db: Session = Depends(get_db)) -> dict:
 @router.post("/ops/trigger_runner", response_model=dict)
 async def trigger_runner(
     request: TriggerRunnerRequest, db: Session = Depends(get_db)
-) -> dict:
+) -> dict | OrjsonResponse:
     """Trigger a runner job.
 
     V2 contract:
@@ -151,6 +259,10 @@ async def trigger_runner(
     3. If runner returns accepted: updates status to running
     4. If runner call fails: updates status to failed with error
     5. Uses short timeout (5-10 seconds max)
+
+    Result reuse (opt-in via JOB_REUSE_TTLS): an identical job_type + payload within the
+    TTL returns the in-flight or succeeded job instead of dispatching to the runner; a
+    succeeded job's stored result is included as-is (JSON text, no decode/re-encode).
     """
     if not settings.runner_enabled:
         raise HTTPException(status_code=503, detail="Runner integration not enabled")
@@ -159,12 +271,31 @@ async def trigger_runner(
             status_code=503, detail="Runner not configured (RUNNER_URL/RUNNER_TOKEN_OUTBOUND)"
         )
 
+    reuse_ttl = job_reuse.reuse_ttl_seconds(request.job_type) if request.reuse else None
+    payload_hash = None
+    if reuse_ttl:
+        payload_hash = job_reuse.payload_hash(request.job_type, request.payload)
+        # Held until commit so concurrent identical triggers see each other's row
+        job_reuse.lock_payload_hash(db, payload_hash)
+        existing = job_reuse.find_reusable_job(db, request.job_type, payload_hash, reuse_ttl)
+        if existing:
+            outcome = job_reuse.record_reuse_hit(db, existing, "api")
+            db.commit()
+            reused = {"job_id": str(existing.id), "status": JobStatus(existing.status).value}
+            if outcome != "result":
+                return {**reused, "message": "Attached to in-flight job"}
+            stored = db.query(cast(OpsJob.result, Text)).filter(OpsJob.id == existing.id).scalar()
+            return OrjsonResponse(
+                {**reused, "message": "Reused prior succeeded result", "result": raw_json(stored)}
+            )
+
     # Create job record
     job = OpsJob(
         job_type=request.job_type,
         status=JobStatus.QUEUED,
         payload=request.payload,
         requested_by="api",
+        payload_hash=payload_hash,
     )
     db.add(job)
     db.commit()
@@ -189,15 +320,106 @@ async def trigger_runner(
             "status": "running",
             "message": "Job accepted by runner",
         }
-    except Exception as e:
-        # Runner call failed — mark as failed
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 429:
+            raise _runner_call_failed(job, e, db)
+        # Runner admission control rejected the job: surface the retry hint to the caller
         job.status = JobStatus.FAILED
-        job.error = str(e)[:500]  # Bound error length
+        job.error = "Runner overloaded (429); retry later"
         db.commit()
+        retry_after = e.response.headers.get("Retry-After", "5")
         raise HTTPException(
-            status_code=502,
-            detail=f"Runner call failed: {str(e)[:200]}",
+            status_code=429,
+            detail="Runner overloaded, retry later",
+            headers={"Retry-After": retry_after},
         )
+    except Exception as e:
+        raise _runner_call_failed(job, e, db)
+
+
+@router.post("/ops/jobs/claw/{command}", response_model=dict)
+async def trigger_claw_command(
+    command: str, request: ClawCommandRequest | None = None, db: Session = Depends(get_db)
+) -> dict | OrjsonResponse:
+    """Queue a Clawdbot command on the runner (same flow as /ops/trigger_runner).
+
+    Output is streamed by the runner into ops_job_events ("stdout" events).
+    """
+    if command not in CLAW_COMMANDS:
+        raise HTTPException(status_code=404, detail=f"Unknown Clawdbot command: {command}")
+    payload = {"args": request.args} if request and request.args else {}
+    return await trigger_runner(
+        TriggerRunnerRequest(job_type=f"claw.{command}", payload=payload), db
+    )
+
+
+def _runner_call_failed(job: OpsJob, e: Exception, db: Session) -> HTTPException:
+    """Mark the job failed and build the 502 to raise."""
+    job.status = JobStatus.FAILED
+    job.error = str(e)[:500]  # Bound error length
+    db.commit()
+    return HTTPException(
+        status_code=502,
+        detail=f"Runner call failed: {str(e)[:200]}",
+    )
+
+
+# Schedules (evaluated by the runner scheduler, never in Vercel)
+def _schedule_to_dict(schedule: OpsSchedule) -> dict:
+    return {
+        "id": str(schedule.id),
+        "name": schedule.name,
+        "job_type": schedule.job_type,
+        "cron": schedule.cron,
+        "payload": schedule.payload,
+        "enabled": schedule.enabled,
+        "overlap_policy": schedule.overlap_policy,
+        "jitter_seconds": schedule.jitter_seconds,
+        "next_run_at": schedule.next_run_at.isoformat() if schedule.next_run_at else None,
+        "last_run_at": schedule.last_run_at.isoformat() if schedule.last_run_at else None,
+        "last_job_id": str(schedule.last_job_id) if schedule.last_job_id else None,
+        "skipped_count": schedule.skipped_count,
+        "last_error": schedule.last_error,
+    }
+
+
+@router.get("/ops/schedules", response_model=dict)
+def list_schedules(db: Session = Depends(get_db)) -> dict:
+    """List recurring job schedules."""
+    schedules = db.query(OpsSchedule).order_by(OpsSchedule.name).all()
+    return {"schedules": [_schedule_to_dict(s) for s in schedules], "count": len(schedules)}
+
+
+@router.put("/ops/schedules", response_model=dict)
+def upsert_schedule(request: UpsertScheduleRequest, db: Session = Depends(get_db)) -> dict:
+    """Create or update a schedule by name.
+
+    Only the field count is checked here; the runner parses the expression and disables
+    the schedule with last_error if it is invalid. next_run_at is reset so the runner
+    recomputes it from the new cron expression.
+    """
+    if request.overlap_policy not in ("skip", "coalesce"):
+        raise HTTPException(status_code=400, detail="overlap_policy must be 'skip' or 'coalesce'")
+    if not (request.cron.startswith("@") or len(request.cron.split()) == 5):
+        raise HTTPException(status_code=400, detail="cron must have 5 fields or be an @alias")
+    if request.jitter_seconds < 0:
+        raise HTTPException(status_code=400, detail="jitter_seconds must be >= 0")
+
+    schedule = db.query(OpsSchedule).filter(OpsSchedule.name == request.name).first()
+    if not schedule:
+        schedule = OpsSchedule(name=request.name)
+        db.add(schedule)
+    schedule.job_type = request.job_type
+    schedule.cron = request.cron
+    schedule.payload = request.payload
+    schedule.enabled = request.enabled
+    schedule.overlap_policy = request.overlap_policy
+    schedule.jitter_seconds = request.jitter_seconds
+    schedule.next_run_at = None
+    schedule.last_error = None
+    db.commit()
+    db.refresh(schedule)
+    return _schedule_to_dict(schedule)
 
 
 # Debug endpoints
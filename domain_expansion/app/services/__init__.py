@@ -0,0 +1 @@
+"""Control plane services (DB-backed logic shared by routers)."""
@@ -0,0 +1,130 @@
+"""Idempotent result reuse for runner jobs.
+
+Opt-in per job type via JOB_REUSE_TTLS (e.g. "metrics_refresh=300,captorator_compose=120").
+Within the TTL, an identical trigger (same job_type + canonical payload) either attaches
+to the in-flight job or returns the prior succeeded result without calling the runner.
+
+Hits are recorded as `reuse_hit` rows in ops_job_events; misses are the ops_jobs rows
+created with a payload_hash. Hit rate is derived from both (no in-process counters,
+since Vercel instances are ephemeral).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session, defer
+
+from domain_expansion.app.models.ops import JobStatus, OpsJob, OpsJobEvent
+from domain_expansion.app.settings import settings
+
+REUSE_HIT_EVENT = "reuse_hit"
+
+
+def parse_reuse_ttls(raw: str | None) -> dict[str, int]:
+    """Parse "job_type=seconds,..." into a dict. Invalid or non-positive entries are ignored."""
+    ttls: dict[str, int] = {}
+    if not raw:
+        return ttls
+    for item in raw.split(","):
+        job_type, sep, seconds = item.partition("=")
+        if not sep:
+            continue
+        try:
+            ttl = int(seconds.strip())
+        except ValueError:
+            continue
+        if ttl > 0:
+            ttls[job_type.strip()] = ttl
+    return ttls
+
+
+def reuse_ttl_seconds(job_type: str) -> int | None:
+    """TTL for job_type, or None if reuse is not enabled for it."""
+    return parse_reuse_ttls(settings.job_reuse_ttls).get(job_type)
+
+
+def payload_hash(job_type: str, payload: dict | None) -> str:
+    """sha256 over (job_type, canonical JSON payload). Key order and whitespace do not matter."""
+    canonical = json.dumps(
+        {"job_type": job_type, "payload": payload or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def lock_payload_hash(db: Session, key: str) -> None:
+    """Serialize concurrent triggers for the same key until the current transaction ends."""
+    db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": int(key[:15], 16)})
+
+
+def find_reusable_job(db: Session, job_type: str, key: str, ttl_seconds: int) -> OpsJob | None:
+    """Most recent in-flight or succeeded job with the same key created within the TTL.
+
+    Cancelled (error set) and failed jobs are never reused. payload/result are not
+    loaded; callers that return the result read it as text.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=ttl_seconds)
+    return (
+        db.query(OpsJob)
+        .options(defer(OpsJob.payload), defer(OpsJob.result))
+        .filter(
+            OpsJob.job_type == job_type,
+            OpsJob.payload_hash == key,
+            OpsJob.created_at >= cutoff,
+            OpsJob.status.in_([JobStatus.QUEUED, JobStatus.RUNNING, JobStatus.SUCCEEDED]),
+            OpsJob.error.is_(None),
+        )
+        .order_by(OpsJob.created_at.desc())
+        .first()
+    )
+
+
+def record_reuse_hit(db: Session, job: OpsJob, requested_by: str | None) -> str:
+    """Record a reuse hit against `job` and return the outcome ("attached" or "result")."""
+    outcome = "result" if JobStatus(job.status) == JobStatus.SUCCEEDED else "attached"
+    db.add(
+        OpsJobEvent(
+            job_id=job.id,
+            event_type=REUSE_HIT_EVENT,
+            message=f"Reused by {requested_by or 'api'} ({outcome})",
+            data={"job_type": job.job_type, "outcome": outcome, "payload_hash": job.payload_hash},
+        )
+    )
+    return outcome
+
+
+def reuse_stats(db: Session, since: datetime) -> dict:
+    """Hit/miss counts and hit rate per job_type since `since`."""
+    misses = dict(
+        db.query(OpsJob.job_type, func.count())
+        .filter(OpsJob.payload_hash.isnot(None), OpsJob.created_at >= since)
+        .group_by(OpsJob.job_type)
+        .all()
+    )
+    hit_job_type = OpsJobEvent.data["job_type"].astext
+    hits = dict(
+        db.query(hit_job_type, func.count())
+        .filter(OpsJobEvent.event_type == REUSE_HIT_EVENT, OpsJobEvent.created_at >= since)
+        .group_by(hit_job_type)
+        .all()
+    )
+
+    by_job_type = {}
+    for job_type in sorted(set(misses) | set(hits)):
+        h, m = hits.get(job_type, 0), misses.get(job_type, 0)
+        by_job_type[job_type] = {"hits": h, "misses": m, "hit_rate": round(h / (h + m), 4)}
+    total_hits, total_misses = sum(hits.values()), sum(misses.values())
+    total = total_hits + total_misses
+    return {
+        "since": since.isoformat(),
+        "hits": total_hits,
+        "misses": total_misses,
+        "hit_rate": round(total_hits / total, 4) if total else 0.0,
+        "by_job_type": by_job_type,
+    }
@@ -0,0 +1,161 @@
+"""Queue health aggregates for GET /ops/jobs/stats.
+
+Each query only touches columns of one existing ops_jobs index, so Postgres can
+answer it from the index (index-only once autovacuum has marked pages all-visible)
+instead of reading table rows:
+
+- backlog, by status, time buckets: idx_ops_jobs_status_created (status, created_at);
+  status is always constrained so each query is a few range scans
+- by job_type: idx_ops_jobs_type_created (job_type, created_at)
+
+Throughput and failure rate are bucketed by job creation time over a bounded window.
+Results are cached in process for JOB_STATS_CACHE_SECONDS so dashboards polling
+several instances cannot turn into a steady aggregate load on the primary.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from domain_expansion.app.models.ops import JobStatus, OpsJob
+
+MAX_HOURS = 168
+MAX_BUCKETS = 500
+TERMINAL = (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value)
+ACTIVE = (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+
+
+class TTLCache:
+    """Small thread-safe cache; concurrent misses for one key compute once.
+
+    Lookups never wait on a computation: `_lock` only guards the dicts, and misses
+    serialize on a per-key lock, so a slow refresh of one key doesn't block others.
+    """
+
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: dict[Any, tuple[float, Any]] = {}
+        self._key_locks: dict[Any, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Any) -> tuple[Any, float] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            age = self.clock() - entry[0] if entry is not None else None
+        if age is not None and age < self.ttl_seconds:
+            return entry[1], age
+        return None
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any]) -> tuple[Any, float]:
+        """Return (value, age_seconds); `compute` runs on a miss or after expiry."""
+        if self.ttl_seconds <= 0:
+            return compute(), 0.0
+        hit = self._lookup(key)
+        if hit is not None:
+            return hit
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            hit = self._lookup(key)  # filled while we waited for the key lock
+            if hit is not None:
+                return hit
+            value = compute()
+            with self._lock:
+                now = self.clock()
+                self._entries = {k: v for k, v in self._entries.items() if now - v[0] < self.ttl_seconds}
+                self._entries[key] = (now, value)
+                self._key_locks = {
+                    k: lock
+                    for k, lock in self._key_locks.items()
+                    if k in self._entries or lock.locked()
+                }
+            return value, 0.0
+
+
+def _epoch(value: datetime) -> float:
+    # ops_jobs timestamps are naive UTC
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def fill_buckets(
+    counts: dict[tuple[int, str], int], since: datetime, until: datetime, bucket_seconds: int
+) -> list[dict]:
+    """Dense series from sparse (bucket_epoch, status) -> count; empty buckets are zeros."""
+    first = int(_epoch(since)) // bucket_seconds * bucket_seconds
+    series = []
+    for start in range(first, int(_epoch(until)) + 1, bucket_seconds):
+        succeeded = counts.get((start, JobStatus.SUCCEEDED.value), 0)
+        failed = counts.get((start, JobStatus.FAILED.value), 0)
+        finished = succeeded + failed
+        series.append(
+            {
+                "start": datetime.fromtimestamp(start, timezone.utc).replace(tzinfo=None),
+                "succeeded": succeeded,
+                "failed": failed,
+                "throughput_per_minute": round(finished * 60 / bucket_seconds, 3),
+                "failure_rate": round(failed / finished, 4) if finished else 0.0,
+            }
+        )
+    return series
+
+
+def job_stats(db: Session, hours: int, bucket_minutes: int) -> dict:
+    """Counts by status and job_type over the last `hours`, plus bucketed throughput."""
+    until = datetime.utcnow()
+    since = until - timedelta(hours=hours)
+    bucket_seconds = bucket_minutes * 60
+
+    # Current backlog is not windowed: old stuck jobs must stay visible
+    active = dict(
+        db.query(OpsJob.status, func.count())
+        .filter(OpsJob.status.in_(ACTIVE))
+        .group_by(OpsJob.status)
+        .all()
+    )
+    by_status = dict(
+        db.query(OpsJob.status, func.count())
+        .filter(OpsJob.status.in_([s.value for s in JobStatus]), OpsJob.created_at >= since)
+        .group_by(OpsJob.status)
+        .all()
+    )
+    by_job_type = dict(
+        db.query(OpsJob.job_type, func.count())
+        .filter(OpsJob.created_at >= since)
+        .group_by(OpsJob.job_type)
+        .all()
+    )
+    bucket = (
+        func.floor(func.extract("epoch", OpsJob.created_at) / bucket_seconds) * bucket_seconds
+    ).label("bucket")
+    bucket_rows = (
+        db.query(bucket, OpsJob.status, func.count())
+        .filter(OpsJob.status.in_(TERMINAL), OpsJob.created_at >= since)
+        # Group by the output label: repeating the expression would bind its parameters twice
+        .group_by("bucket", OpsJob.status)
+        .all()
+    )
+
+    buckets = fill_buckets(
+        {(int(b), status): n for b, status, n in bucket_rows}, since, until, bucket_seconds
+    )
+    succeeded = by_status.get(JobStatus.SUCCEEDED.value, 0)
+    failed = by_status.get(JobStatus.FAILED.value, 0)
+    return {
+        "generated_at": until,
+        "since": since,
+        "hours": hours,
+        "bucket_minutes": bucket_minutes,
+        "backlog": {status: active.get(status, 0) for status in ACTIVE},
+        "by_status": {s.value: by_status.get(s.value, 0) for s in JobStatus},
+        "by_job_type": dict(sorted(by_job_type.items())),
+        "total": sum(by_status.values()),
+        "failure_rate": round(failed / (succeeded + failed), 4) if succeeded + failed else 0.0,
+        "buckets": buckets,
+    }
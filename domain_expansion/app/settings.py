@@ -46,6 +46,12 @@ class Settings(BaseSettings):
     runner_token_outbound: str | None = Field(default=None, alias="RUNNER_TOKEN_OUTBOUND")
     control_plane_base_url: str | None = Field(default=None, alias="CONTROL_PLANE_BASE_URL")
 
+    # Idempotent result reuse (opt-in per job type), e.g. "metrics_refresh=300,captorator_compose=120"
+    job_reuse_ttls: str | None = Field(default=None, alias="JOB_REUSE_TTLS")
+
+    # GET /ops/jobs/stats in-process cache lifetime (0 disables caching)
+    job_stats_cache_seconds: int = Field(default=15, alias="JOB_STATS_CACHE_SECONDS")
+
     # CORS
     cors_origins: str | None = Field(default=None, alias="CORS_ORIGINS")
 
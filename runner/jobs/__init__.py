@@ -5,6 +5,33 @@ V2 contract: Job handlers are stubs that validate inputs and return structured r
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
+import multiprocessing
+import shlex
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import httpx
+
+from runner.lib import asset_qc, nearsight
+from runner.lib.clawdbot import ClawdbotPool
+from runner.lib.config import parse_mapping
+from runner.lib.context import current_job, emit_event
+from runner.lib.pipeline import Stage, run_pipeline
+from runner.lib.workflow import WORKFLOW_JOB_TYPE, run_workflow
+from runner.settings import runner_settings
+
+# Shared across asset_qc jobs: worker processes stay warm and the cache stays populated
+_asset_qc_executor: ProcessPoolExecutor | None = None
+_asset_qc_cache = asset_qc.AnalysisCache(runner_settings.runner_asset_cache_dir)
+# Created on first claw.* job so the runner starts fine without CLAWDBOT_BIN
+_clawdbot_pool: ClawdbotPool | None = None
+
+CLAW_JOB_PREFIX = "claw."
+
 
 async def dispatch_job(job_type: str, payload: dict) -> dict:
     """Dispatch a job to the appropriate handler.
@@ -15,26 +42,146 @@ async def dispatch_job(job_type: str, payload: dict) -> dict:
         return await handle_nearsight_collect_refresh(payload)
     elif job_type == "captorator_compose":
         return await handle_captorator_compose(payload)
+    elif job_type == "captorator_asset_qc":
+        return await handle_captorator_asset_qc(payload)
     elif job_type == "metrics_refresh":
         return await handle_metrics_refresh(payload)
+    elif job_type.startswith(CLAW_JOB_PREFIX):
+        return await handle_claw_command(job_type[len(CLAW_JOB_PREFIX) :], payload)
+    elif job_type == WORKFLOW_JOB_TYPE:
+        return await handle_workflow(payload)
+    elif job_type == "bench_synthetic":
+        return await handle_bench_synthetic(payload)
     else:
         raise ValueError(f"Unknown job type: {job_type}")
 
 
 async def handle_nearsight_collect_refresh(payload: dict) -> dict:
-    """Nearsight collect and refresh job (stub).
+    """Refresh Nearsight articles from RSS/Atom feeds as a streaming pipeline.
 
-    V2 contract: Validates inputs, returns structured result.
+    fetch -> parse -> normalize -> score -> dedupe -> upsert run concurrently with
+    bounded queues between them (runner.lib.pipeline), so memory stays flat as the
+    feed count grows. Payload (all optional): feeds (default NEARSIGHT_FEEDS),
+    keywords (list or {keyword: weight}), min_score, half_life_hours, top_n,
+    concurrency ({stage: workers}, over NEARSIGHT_STAGE_CONCURRENCY), dry_run (skip
+    the upsert). The result has per-stage throughput and queue-wait timings. The job
+    fails if every feed fails or any upsert batch fails.
     """
-    # Validate inputs
     if not payload:
         payload = {}
-    # Stub implementation
+    feeds = payload.get("feeds") or [
+        f.strip() for f in (runner_settings.nearsight_feeds or "").split(",") if f.strip()
+    ]
+    if not isinstance(feeds, list) or not feeds:
+        raise ValueError("No feeds: set payload.feeds or NEARSIGHT_FEEDS")
+    if len(feeds) > nearsight.MAX_FEEDS:
+        raise ValueError(f"{len(feeds)} feeds (max {nearsight.MAX_FEEDS})")
+    dry_run = bool(payload.get("dry_run"))
+    ctx = current_job.get()
+    session_factory = ctx.session_factory if ctx else None
+    if not dry_run and session_factory is None:
+        raise ValueError("nearsight_collect_refresh needs a database session (or dry_run)")
+
+    concurrency = {
+        **nearsight.DEFAULT_CONCURRENCY,
+        **parse_mapping(runner_settings.nearsight_stage_concurrency, int),
+        **{k: int(v) for k, v in (payload.get("concurrency") or {}).items()},
+    }
+    keywords = nearsight.parse_keywords(payload.get("keywords"))
+    min_score = float(payload.get("min_score", 0.0))
+    half_life_hours = max(float(payload.get("half_life_hours", 24.0)), 0.1)
+    top_n = min(max(int(payload.get("top_n", 10)), 0), 20)
+    max_bytes = runner_settings.nearsight_max_feed_bytes
+    now = datetime.utcnow()
+    deduper = nearsight.Deduper()
+
+    async def fetch(url: str):
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) > max_bytes:
+                    raise ValueError(f"Feed exceeds {max_bytes} bytes")
+        yield {"source": url, "body": bytes(body)}
+
+    async def parse(feed: dict):
+        # XML parsing is CPU-bound: keep it off the event loop
+        for entry in await asyncio.to_thread(nearsight.parse_feed, feed["body"], feed["source"]):
+            yield entry
+
+    async def normalize(entry: dict):
+        article = nearsight.normalize_entry(entry)
+        if article is not None:
+            yield article
+
+    async def score(article: dict):
+        article["score"] = nearsight.score_entry(article, keywords, now, half_life_hours)
+        if article["score"] >= min_score:
+            yield article
+
+    async def dedupe(article: dict):
+        if deduper.is_new(article):
+            yield article
+
+    async def upsert(batch: list[dict]):
+        await asyncio.to_thread(nearsight.upsert_articles, session_factory, batch)
+        for article in batch:
+            yield article
+
+    # Only the best top_n articles are kept for the result (bounded heap)
+    top: list[tuple[float, int, dict]] = []
+    arrival = itertools.count()
+
+    async def keep_top(article: dict) -> None:
+        item = (article["score"], next(arrival), article)
+        if len(top) < top_n:
+            heapq.heappush(top, item)
+        elif top_n and item[0] > top[0][0]:
+            heapq.heapreplace(top, item)
+
+    fns = {
+        "fetch": fetch,
+        "parse": parse,
+        "normalize": normalize,
+        "score": score,
+        "dedupe": dedupe,
+        "upsert": upsert,
+    }
+    stages = [
+        Stage(
+            name,
+            fns[name],
+            concurrency=max(1, concurrency.get(name, 1)),
+            queue_size=runner_settings.nearsight_queue_size,
+            batch_size=runner_settings.nearsight_upsert_batch if name == "upsert" else 1,
+        )
+        for name in nearsight.STAGES
+        if not (dry_run and name == "upsert")
+    ]
+    timeout = httpx.Timeout(runner_settings.nearsight_fetch_timeout_seconds)
+    async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        stats = await run_pipeline(feeds, stages, sink=keep_top)
+
+    stage_stats = stats["stages"]
+    failure = nearsight.refresh_failure(stage_stats, len(feeds))
+    if failure:
+        raise RuntimeError(failure)
+    last = "dedupe" if dry_run else "upsert"
     return {
-        "not_implemented": True,
         "job_type": "nearsight_collect_refresh",
-        "message": "Job handler not yet implemented",
-        "payload": payload,
+        "dry_run": dry_run,
+        "feeds": len(feeds),
+        "feeds_failed": stage_stats["fetch"]["errors"] + stage_stats["parse"]["errors"],
+        "entries": stage_stats["parse"]["items_out"],
+        "duplicates": deduper.dropped,
+        "articles": stage_stats[last]["items_out"],
+        "upserted": 0 if dry_run else stage_stats["upsert"]["items_out"],
+        "candidates": [
+            {"title": a["title"][:120], "url": a["url"], "score": a["score"]}
+            for _, _, a in sorted(top, key=lambda t: t[0], reverse=True)
+        ],
+        "pipeline": stats,
     }
 
 
@@ -55,6 +202,87 @@ async def handle_captorator_compose(payload: dict) -> dict:
     }
 
 
+async def handle_captorator_asset_qc(payload: dict) -> dict:
+    """Captorator asset QC over a batch of local image files.
+
+    Payload: paths (files or directories relative to RUNNER_ASSET_ROOT), optional
+    thresholds overriding asset_qc.DEFAULT_THRESHOLDS.
+    """
+    global _asset_qc_executor
+    if not payload:
+        payload = {}
+    if not runner_settings.runner_asset_root:
+        raise ValueError("RUNNER_ASSET_ROOT is not configured")
+    paths = payload.get("paths")
+    if not isinstance(paths, list) or not paths:
+        raise ValueError("payload.paths must be a non-empty list")
+
+    # rglob/stat on a large tree is blocking filesystem I/O
+    files = await asyncio.to_thread(asset_qc.resolve_assets, runner_settings.runner_asset_root, paths)
+    if _asset_qc_executor is None:
+        # forkserver, not fork: the runner already has threads (asyncio.to_thread), and
+        # forking a threaded process can deadlock the children
+        _asset_qc_executor = ProcessPoolExecutor(
+            max_workers=runner_settings.runner_asset_qc_workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+    result = await asset_qc.run_asset_qc(
+        files,
+        _asset_qc_executor,
+        _asset_qc_cache,
+        thresholds=payload.get("thresholds"),
+        root=runner_settings.runner_asset_root,
+    )
+    return {"job_type": "captorator_asset_qc", **result}
+
+
+def get_clawdbot_pool() -> ClawdbotPool:
+    global _clawdbot_pool
+    if _clawdbot_pool is None:
+        if not runner_settings.clawdbot_bin:
+            raise ValueError("CLAWDBOT_BIN is not configured")
+        serve_args = runner_settings.clawdbot_serve_args
+        _clawdbot_pool = ClawdbotPool(
+            shlex.split(runner_settings.clawdbot_bin),
+            workdir=runner_settings.clawdbot_workdir,
+            size=runner_settings.clawdbot_pool_size,
+            timeout=runner_settings.clawdbot_timeout_seconds,
+            max_output_bytes=runner_settings.clawdbot_max_output_bytes,
+            serve_args=shlex.split(serve_args) if serve_args else None,
+        )
+    return _clawdbot_pool
+
+
+async def handle_claw_command(command: str, payload: dict) -> dict:
+    """Clawdbot command job (claw.schema_drift, claw.index_intel, claw.query_audit).
+
+    Output is streamed to ops_job_events as batched "stdout" events while the command runs;
+    the job result keeps only the exit status and an output tail.
+    """
+    if not payload:
+        payload = {}
+    seq = 0
+
+    async def on_output(lines: list[str]) -> None:
+        nonlocal seq
+        seq += 1
+        await emit_event("stdout", None, {"seq": seq, "lines": lines})
+
+    result = await get_clawdbot_pool().run(command, payload.get("args") or {}, on_output=on_output)
+    return {"job_type": f"{CLAW_JOB_PREFIX}{command}", **result}
+
+
+async def shutdown() -> None:
+    """Release long-lived job resources (called on runner shutdown)."""
+    global _asset_qc_executor, _clawdbot_pool
+    if _clawdbot_pool is not None:
+        await _clawdbot_pool.close()
+        _clawdbot_pool = None
+    if _asset_qc_executor is not None:
+        _asset_qc_executor.shutdown(wait=False, cancel_futures=True)
+        _asset_qc_executor = None
+
+
 async def handle_metrics_refresh(payload: dict) -> dict:
     """Metrics refresh job (stub).
 
@@ -70,3 +298,39 @@ async def handle_metrics_refresh(payload: dict) -> dict:
         "message": "Job handler not yet implemented",
         "payload": payload,
     }
+
+
+async def handle_workflow(payload: dict) -> dict:
+    """Run a DAG of job steps in-process (see runner.lib.workflow).
+
+    Steps are dispatched through dispatch_job directly: one ops_jobs row for the
+    whole workflow, step progress in ops_job_events. Each step call is admitted
+    through the runner's admission control like a standalone job.
+    """
+    ctx = current_job.get()
+    return await run_workflow(payload or {}, dispatch_job, admission=ctx.admission if ctx else None)
+
+
+async def handle_bench_synthetic(payload: dict) -> dict:
+    """Synthetic job for benchmarks (not in the default allowlist).
+
+    Payload: cpu_ms (busy loop on the event loop), io_ms (asyncio.sleep), result_bytes.
+    """
+    if not payload:
+        payload = {}
+    cpu_ms = max(float(payload.get("cpu_ms", 0)), 0.0)
+    io_ms = max(float(payload.get("io_ms", 0)), 0.0)
+    result_bytes = max(int(payload.get("result_bytes", 0)), 0)
+
+    if cpu_ms:
+        deadline = time.perf_counter() + cpu_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+    if io_ms:
+        await asyncio.sleep(io_ms / 1000)
+    return {
+        "job_type": "bench_synthetic",
+        "cpu_ms": cpu_ms,
+        "io_ms": io_ms,
+        "data": "x" * result_bytes,
+    }
@@ -0,0 +1,211 @@
+"""Admission control and priority lanes for runner jobs.
+
+Every accepted job takes a slot. Slots are bounded globally (RUNNER_MAX_CONCURRENCY)
+and per job type (RUNNER_JOB_CAPS). Job types map to priority classes
+(RUNNER_JOB_PRIORITIES, default class "default"); when a slot frees, waiting jobs are
+granted across classes by stride scheduling, so each class gets throughput in
+proportion to its weight (RUNNER_PRIORITY_WEIGHTS) and no class starves.
+
+Each class has a bounded wait queue (RUNNER_MAX_QUEUED). When it is full `admit()`
+raises Overloaded with a retry-after hint instead of queueing without bound. Forced
+tickets (scheduler-fired jobs, workflow steps) are bounded by their callers and do not
+count against that limit, so they cannot crowd direct submissions out of a lane.
+
+A coordinating job (a workflow) can `detach()` its ticket: it gives back the global
+slot but keeps counting against its own per-type cap until released, so
+RUNNER_JOB_CAPS bounds how many run at once without them holding slots their steps
+need.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+DEFAULT_CLASS = "default"
+DEFAULT_WEIGHTS = {"interactive": 8, DEFAULT_CLASS: 4, "batch": 1}
+_STRIDE = 1_000_000
+
+
+class Overloaded(Exception):
+    """Raised by admit() when the job's priority class queue is full."""
+
+    def __init__(self, job_type: str, priority: str, retry_after: int) -> None:
+        super().__init__(f"Runner overloaded for '{job_type}' ({priority} lane)")
+        self.job_type = job_type
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+@dataclass(eq=False)
+class Ticket:
+    job_type: str
+    priority: str
+    granted: asyncio.Future = field(repr=False)
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    forced: bool = False
+    detached: bool = False
+
+    async def wait(self) -> None:
+        """Wait until a slot is granted."""
+        await self.granted
+
+
+@dataclass
+class _Lane:
+    weight: int
+    queue: deque = field(default_factory=deque)
+    # Forced tickets in `queue`; excluded from the RUNNER_MAX_QUEUED check
+    forced_queued: int = 0
+    pass_value: int = 0
+    running: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    # EWMA of slot hold time, used for retry-after hints
+    avg_seconds: float = 1.0
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        job_caps: dict[str, int] | None = None,
+        priorities: dict[str, str] | None = None,
+        weights: dict[str, int] | None = None,
+        max_queued: int = 32,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.job_caps = {k: max(1, v) for k, v in (job_caps or {}).items()}
+        self.priorities = dict(priorities or {})
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        for cls in self.priorities.values():
+            weights.setdefault(cls, DEFAULT_WEIGHTS[DEFAULT_CLASS])
+        self.lanes = {cls: _Lane(weight=max(1, w)) for cls, w in weights.items()}
+        self.max_queued = max(0, max_queued)
+        self.running = 0
+        self.running_by_type: dict[str, int] = {}
+
+    def priority_of(self, job_type: str) -> str:
+        return self.priorities.get(job_type, DEFAULT_CLASS)
+
+    def _has_capacity(self, job_type: str) -> bool:
+        if self.running >= self.max_concurrency:
+            return False
+        cap = self.job_caps.get(job_type)
+        return cap is None or self.running_by_type.get(job_type, 0) < cap
+
+    def _grant(self, ticket: Ticket) -> None:
+        lane = self.lanes[ticket.priority]
+        lane.running += 1
+        lane.admitted += 1
+        lane.pass_value += _STRIDE // lane.weight
+        self.running += 1
+        self.running_by_type[ticket.job_type] = self.running_by_type.get(ticket.job_type, 0) + 1
+        ticket.started_at = time.monotonic()
+        if not ticket.granted.done():
+            ticket.granted.set_result(None)
+
+    def _retry_after(self, lane: _Lane) -> int:
+        backlog = len(lane.queue) + 1
+        estimate = lane.avg_seconds * backlog / self.max_concurrency
+        return min(max(math.ceil(estimate), 1), 300)
+
+    def admit(self, job_type: str, force: bool = False) -> Ticket:
+        """Grant a slot now or queue the job; raise Overloaded if its lane queue is full.
+
+        `force` queues regardless of the limit and is not counted against it (used for
+        scheduler-fired jobs and workflow steps, whose number is bounded by the schedules
+        table and by max_parallel).
+        """
+        priority = self.priority_of(job_type)
+        lane = self.lanes[priority]
+        waiting = len(lane.queue) - lane.forced_queued
+        if not force and waiting >= self.max_queued and not self._has_capacity(job_type):
+            lane.rejected += 1
+            raise Overloaded(job_type, priority, self._retry_after(lane))
+
+        ticket = Ticket(job_type, priority, asyncio.get_running_loop().create_future(), forced=force)
+        if not lane.queue and not lane.running:
+            self._catch_up(lane)
+        lane.queue.append(ticket)
+        lane.forced_queued += force
+        self._dispatch_waiting()
+        return ticket
+
+    def _dequeue(self, lane: _Lane, ticket: Ticket) -> None:
+        lane.queue.remove(ticket)
+        lane.forced_queued -= ticket.forced
+
+    def _catch_up(self, lane: _Lane) -> None:
+        """An idle lane rejoins at the current minimum pass so it cannot bank credit."""
+        active = [l.pass_value for l in self.lanes.values() if l.queue or l.running]
+        if active:
+            lane.pass_value = max(lane.pass_value, min(active))
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot (or drop it from the queue) and grant waiting jobs."""
+        lane = self.lanes[ticket.priority]
+        if ticket.started_at is None:
+            if ticket in lane.queue:
+                self._dequeue(lane, ticket)
+            if not ticket.granted.done():
+                ticket.granted.cancel()
+            return
+
+        if not ticket.detached:
+            self._free_slot(lane, ticket)
+        self.running_by_type[ticket.job_type] -= 1
+        ticket.started_at = None
+        self._dispatch_waiting()
+
+    def detach(self, ticket: Ticket) -> None:
+        """Free a running ticket's global slot; its per-type count is held until release()."""
+        if ticket.started_at is None or ticket.detached:
+            return
+        self._free_slot(self.lanes[ticket.priority], ticket)
+        ticket.detached = True
+        self._dispatch_waiting()
+
+    def _free_slot(self, lane: _Lane, ticket: Ticket) -> None:
+        held = time.monotonic() - ticket.started_at
+        lane.avg_seconds = 0.8 * lane.avg_seconds + 0.2 * held
+        lane.running -= 1
+        self.running -= 1
+
+    def _dispatch_waiting(self) -> None:
+        while self.running < self.max_concurrency:
+            best = None
+            for lane in self.lanes.values():
+                candidate = next((t for t in lane.queue if self._has_capacity(t.job_type)), None)
+                if candidate and (best is None or lane.pass_value < best[0].pass_value):
+                    best = (lane, candidate)
+            if best is None:
+                return
+            lane, ticket = best
+            self._dequeue(lane, ticket)
+            self._grant(ticket)
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "running_by_job_type": {k: v for k, v in self.running_by_type.items() if v},
+            "job_caps": self.job_caps,
+            "lanes": {
+                name: {
+                    "weight": lane.weight,
+                    "running": lane.running,
+                    "queued": len(lane.queue),
+                    "queued_forced": lane.forced_queued,
+                    "max_queued": self.max_queued,
+                    "admitted": lane.admitted,
+                    "rejected": lane.rejected,
+                    "avg_seconds": round(lane.avg_seconds, 3),
+                }
+                for name, lane in self.lanes.items()
+            },
+        }
@@ -0,0 +1,295 @@
+"""Captorator asset QC: parallel image checks with a content-addressed cache.
+
+Analysis (decode, dimensions, brightness, blur, perceptual hash) is CPU-heavy and runs
+in a process pool across cores. It depends only on file content, so results are cached
+by sha256 (in memory and as JSON files under the cache dir); re-checking an unchanged
+asset costs one hash. Threshold checks and duplicate grouping are cheap and applied
+per batch, so changing thresholds never invalidates the cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from PIL import Image, ImageFilter, ImageStat
+
+# Bump when analysis output changes so stale cache entries are ignored
+ANALYSIS_VERSION = 1
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff"}
+MAX_BATCH = 1000
+# Downscale before blur/brightness so cost does not grow with megapixels
+_STATS_MAX_SIDE = 512
+_LAPLACIAN = ImageFilter.Kernel((3, 3), [0, 1, 0, 1, -4, 1, 0, 1, 0], scale=1, offset=128)
+
+DEFAULT_THRESHOLDS = {
+    "min_width": 1080,
+    "min_height": 1080,
+    # Allowed width/height ratios (e.g. 1:1, 4:5, 9:16) and tolerance
+    "aspect_ratios": [1.0, 0.8, 0.5625],
+    "aspect_tolerance": 0.02,
+    "min_sharpness": 100.0,
+    "min_brightness": 40.0,
+    "max_brightness": 220.0,
+    "duplicate_distance": 6,
+}
+
+
+def sha256_file(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dhash(image: Image.Image, size: int = 8) -> str:
+    """64-bit difference hash (hex) of a grayscale image."""
+    small = image.convert("L").resize((size + 1, size), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()  # one byte per pixel in mode "L"
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return f"{bits:0{size * size // 4}x}"
+
+
+def analyze_bytes(data: bytes) -> dict[str, Any]:
+    """Content-only analysis (cacheable). Runs in a worker process."""
+    with Image.open(io.BytesIO(data)) as img:
+        img.load()
+        width, height = img.size
+        fmt = img.format
+        gray = img.convert("L")
+    gray.thumbnail((_STATS_MAX_SIDE, _STATS_MAX_SIDE))
+    brightness = ImageStat.Stat(gray).mean[0]
+    # Variance of the Laplacian: low values mean few edges (blurry)
+    sharpness = ImageStat.Stat(gray.filter(_LAPLACIAN)).var[0]
+    return {
+        "version": ANALYSIS_VERSION,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "bytes": len(data),
+        "format": fmt,
+        "width": width,
+        "height": height,
+        "aspect_ratio": round(width / height, 4) if height else None,
+        "brightness": round(brightness, 2),
+        "sharpness": round(sharpness, 2),
+        "dhash": dhash(gray),
+    }
+
+
+def analyze_path(path: str) -> dict[str, Any]:
+    """Worker entrypoint: read and analyze one file; errors are returned, not raised."""
+    try:
+        with open(path, "rb") as fh:
+            return analyze_bytes(fh.read())
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {str(e)[:200]}"}
+
+
+def evaluate(analysis: dict[str, Any], thresholds: dict[str, Any]) -> list[str]:
+    """Names of failed checks for one analysed asset."""
+    if "error" in analysis:
+        return ["decode"]
+    failed = []
+    if analysis["width"] < thresholds["min_width"] or analysis["height"] < thresholds["min_height"]:
+        failed.append("dimensions")
+    ratios = thresholds.get("aspect_ratios") or []
+    if ratios and analysis["aspect_ratio"] is not None and not any(
+        abs(analysis["aspect_ratio"] - r) <= thresholds["aspect_tolerance"] for r in ratios
+    ):
+        failed.append("aspect_ratio")
+    if analysis["sharpness"] < thresholds["min_sharpness"]:
+        failed.append("blur")
+    if not thresholds["min_brightness"] <= analysis["brightness"] <= thresholds["max_brightness"]:
+        failed.append("brightness")
+    return failed
+
+
+def group_duplicates(assets: list[dict[str, Any]], max_distance: int) -> list[list[str]]:
+    """Group paths whose perceptual hashes are within `max_distance` bits (union-find)."""
+    hashed = [a for a in assets if a.get("dhash")]
+    values = [int(a["dhash"], 16) for a in hashed]
+    parent = list(range(len(hashed)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i in range(len(hashed)):
+        for j in range(i + 1, len(hashed)):
+            if (values[i] ^ values[j]).bit_count() <= max_distance:
+                parent[find(i)] = find(j)
+
+    groups: dict[int, list[str]] = {}
+    for i, asset in enumerate(hashed):
+        groups.setdefault(find(i), []).append(asset["path"])
+    return [sorted(g) for g in groups.values() if len(g) > 1]
+
+
+def find_duplicates(assets: list[dict[str, Any]], max_distance: int, limit: int = 20) -> dict[str, list]:
+    """Exact (same sha256) and perceptual duplicate groups, at most `limit` of each.
+
+    The perceptual pass compares all pairs (O(n^2)): call it off the event loop.
+    """
+    exact: dict[str, list[str]] = {}
+    for asset in assets:
+        if asset.get("sha256"):
+            exact.setdefault(asset["sha256"], []).append(asset["path"])
+    return {
+        "exact": [sorted(p) for p in exact.values() if len(p) > 1][:limit],
+        "perceptual": group_duplicates(assets, max_distance)[:limit],
+    }
+
+
+class AnalysisCache:
+    """sha256 -> analysis, in memory (LRU) and optionally on disk."""
+
+    def __init__(self, cache_dir: str | None = None, max_entries: int = 10_000) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        # get/put run in worker threads (disk I/O), possibly for several jobs at once
+        self._lock = threading.Lock()
+
+    def _file(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def get(self, digest: str) -> dict | None:
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                self._memory.move_to_end(digest)
+                return entry
+        if self.cache_dir is None:
+            return None
+        try:
+            entry = json.loads(self._file(digest).read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != ANALYSIS_VERSION:
+            return None
+        self._remember(digest, entry)
+        return entry
+
+    def put(self, digest: str, analysis: dict) -> None:
+        self._remember(digest, analysis)
+        if self.cache_dir is None:
+            return
+        target = self._file(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(analysis))
+        os.replace(tmp, target)  # atomic: concurrent writers never expose partial files
+
+    def _remember(self, digest: str, analysis: dict) -> None:
+        with self._lock:
+            self._memory[digest] = analysis
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+def resolve_assets(root: str, paths: list[str]) -> list[str]:
+    """Resolve payload paths (files or directories) under `root`; reject anything outside it."""
+    base = Path(root).resolve()
+    resolved: list[str] = []
+    for raw in paths:
+        candidate = (base / raw).resolve()
+        if candidate != base and base not in candidate.parents:
+            raise ValueError(f"Asset path escapes asset root: {raw}")
+        if candidate.is_dir():
+            resolved.extend(
+                str(p) for p in sorted(candidate.rglob("*"))
+                if p.is_file() and p.suffix.lower() in IMAGE_EXTENSIONS
+            )
+        elif candidate.is_file():
+            resolved.append(str(candidate))
+        else:
+            raise ValueError(f"Asset not found: {raw}")
+    if len(resolved) > MAX_BATCH:
+        raise ValueError(f"Batch has {len(resolved)} assets (max {MAX_BATCH})")
+    return resolved
+
+
+async def run_asset_qc(
+    files: list[str],
+    executor: ProcessPoolExecutor,
+    cache: AnalysisCache,
+    thresholds: dict[str, Any] | None = None,
+    root: str | None = None,
+) -> dict[str, Any]:
+    """Analyse `files` (absolute paths) in parallel and apply QC checks."""
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+
+    # Hashing is IO-bound and much cheaper than decoding: hash first, decode only misses
+    digests = await asyncio.gather(*(asyncio.to_thread(sha256_file, f) for f in files))
+    # Cache lookups may read JSON files from disk: keep them off the event loop
+    cached = await asyncio.to_thread(lambda: [cache.get(d) for d in digests])
+    analyses: dict[str, dict] = {}
+    misses: dict[str, str] = {}
+    for path, digest, entry in zip(files, digests, cached):
+        if entry is not None:
+            analyses[path] = entry
+        else:
+            misses.setdefault(digest, path)
+
+    fresh = await asyncio.gather(
+        *(loop.run_in_executor(executor, analyze_path, path) for path in misses.values())
+    )
+    by_digest = dict(zip(misses, fresh))
+    await asyncio.to_thread(
+        lambda: [cache.put(d, a) for d, a in by_digest.items() if "error" not in a]
+    )
+    for path, digest in zip(files, digests):
+        analyses.setdefault(path, by_digest.get(digest, {"error": "missing analysis"}))
+
+    def display(path: str) -> str:
+        return os.path.relpath(path, root) if root else path
+
+    assets = []
+    for path in files:
+        analysis = analyses[path]
+        assets.append({"path": display(path), **analysis, "failed": evaluate(analysis, thresholds)})
+
+    duplicates = await asyncio.to_thread(find_duplicates, assets, thresholds["duplicate_distance"])
+    wall = time.perf_counter() - start
+    total_bytes = sum(a.get("bytes", 0) for a in assets)
+    failing = [a for a in assets if a["failed"]]
+
+    return {
+        "checked": len(assets),
+        "passed": len(assets) - len(failing),
+        "failed": len(failing),
+        # Keep the result compact (ops_jobs.result is capped at 10KB)
+        "failures": [
+            {k: a.get(k) for k in ("path", "failed", "width", "height", "sharpness", "brightness", "error")}
+            for a in failing[:50]
+        ],
+        "duplicates": duplicates,
+        "throughput": {
+            "wall_ms": round(wall * 1000, 3),
+            "assets_per_second": round(len(assets) / wall, 2) if wall else None,
+            "mb_per_second": round(total_bytes / wall / 1_000_000, 3) if wall else None,
+            "bytes": total_bytes,
+            "cache_hits": sum(1 for d in digests if d not in misses),
+            "decoded": len(misses),
+            "workers": getattr(executor, "_max_workers", None),
+        },
+    }
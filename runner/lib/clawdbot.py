@@ -0,0 +1,292 @@
+"""Bounded async subprocess pool for Clawdbot commands.
+
+Only the commands in CLAW_COMMANDS can run (no arbitrary execution). Each command gets
+its arguments as one JSON line on stdin; stdout/stderr lines are streamed to a callback
+in batches so callers can persist progress incrementally.
+
+Two modes:
+- spawn (default): one `CLAWDBOT_BIN <command>` process per command.
+- persistent: when CLAWDBOT_SERVE_ARGS is set, up to `size` long-lived
+  `CLAWDBOT_BIN <serve args>` workers are reused. Requests are JSON lines
+  `{"id", "command", "args"}`; the worker answers with `{"id", "line"}` lines and a final
+  `{"id", "done": true, "exit_code"}`. A worker that times out, overflows the output
+  limit or exits is killed and replaced on next use.
+
+Both modes enforce a per-command timeout, an output size limit and a per-line limit
+(_READ_LIMIT); exceeding either limit fails the command and kills its process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+CLAW_COMMANDS = ("schema_drift", "index_intel", "query_audit")
+# asyncio StreamReader line limit. A longer line makes readline() raise ValueError;
+# it is treated as output overflow (result truncated, process killed).
+_READ_LIMIT = 1 << 20
+
+LinesCallback = Callable[[list[str]], Awaitable[None]]
+
+
+class ClawdbotError(RuntimeError):
+    """Command failed, timed out or could not be started."""
+
+
+class _LineBatcher:
+    """Buffers output lines and flushes every `max_lines` lines or `interval` seconds.
+
+    The interval is driven by `flush_periodically()`, so sparse output reaches the sink
+    while the command is still running, not only when the next line arrives.
+    """
+
+    def __init__(self, sink: LinesCallback | None, max_lines: int = 50, interval: float = 0.5) -> None:
+        self.sink = sink
+        self.max_lines = max_lines
+        self.interval = interval
+        self.pending: list[str] = []
+        self.last_flush = time.monotonic()
+        # Keeps batches in order when the timer and add() flush concurrently
+        self._flush_lock = asyncio.Lock()
+        self._closed = asyncio.Event()
+
+    async def add(self, line: str) -> None:
+        self.pending.append(line)
+        if len(self.pending) >= self.max_lines or time.monotonic() - self.last_flush >= self.interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            lines, self.pending = self.pending, []
+            if lines and self.sink is not None:
+                await self.sink(lines)
+            self.last_flush = time.monotonic()
+
+    async def flush_periodically(self) -> None:
+        """Flush every `interval` until close(); never cancelled mid-flush."""
+        while not self._closed.is_set():
+            try:
+                await asyncio.wait_for(self._closed.wait(), self.interval)
+            except TimeoutError:
+                if time.monotonic() - self.last_flush >= self.interval:
+                    await self.flush()
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class _Output:
+    """Tracks output size against the limit and keeps a tail for the job result."""
+
+    def __init__(self, batcher: _LineBatcher, max_bytes: int, tail_lines: int = 40) -> None:
+        self.batcher = batcher
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.truncated = False
+        self.line_too_long = False
+        self.tail: deque[str] = deque(maxlen=tail_lines)
+
+    async def add(self, line: str) -> bool:
+        """Record a line; returns False once the limit is exceeded (caller should stop)."""
+        self.bytes += len(line.encode("utf-8", "replace")) + 1
+        if self.bytes > self.max_bytes:
+            self.truncated = True
+            return False
+        self.tail.append(line)
+        await self.batcher.add(line)
+        return True
+
+    def overlong_line(self) -> None:
+        """The reader hit a line longer than _READ_LIMIT."""
+        self.truncated = True
+        self.line_too_long = True
+
+
+async def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        proc.kill()
+    await proc.wait()
+
+
+class _PersistentWorker:
+    def __init__(self, proc: asyncio.subprocess.Process) -> None:
+        self.proc = proc
+        self.next_id = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.returncode is None
+
+    async def run(self, command: str, args: dict, output: _Output) -> int:
+        self.next_id += 1
+        request_id = self.next_id
+        request = {"id": request_id, "command": command, "args": args}
+        self.proc.stdin.write(json.dumps(request).encode() + b"\n")
+        await self.proc.stdin.drain()
+        while True:
+            try:
+                raw = await self.proc.stdout.readline()
+            except ValueError:  # line over _READ_LIMIT; caller discards the worker
+                output.overlong_line()
+                return -1
+            if not raw:
+                raise ClawdbotError("Clawdbot worker exited unexpectedly")
+            text = raw.decode("utf-8", "replace").rstrip("\n")
+            try:
+                message = json.loads(text)
+            except ValueError:
+                message = None
+            if not isinstance(message, dict) or message.get("id") != request_id:
+                continue  # stray line from the worker (e.g. startup banner)
+            if message.get("done"):
+                return int(message.get("exit_code", 0))
+            if not await output.add(str(message.get("line", ""))):
+                return -1
+
+
+class ClawdbotPool:
+    def __init__(
+        self,
+        argv: list[str],
+        workdir: str | None = None,
+        size: int = 2,
+        timeout: float = 120.0,
+        max_output_bytes: int = 1_000_000,
+        serve_args: list[str] | None = None,
+    ) -> None:
+        if not argv:
+            raise ClawdbotError("CLAWDBOT_BIN is not configured")
+        self.argv = list(argv)
+        self.workdir = workdir
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.serve_args = list(serve_args) if serve_args else None
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: list[_PersistentWorker] = []
+        self.started = 0
+        self.reused = 0
+
+    @property
+    def persistent(self) -> bool:
+        return self.serve_args is not None
+
+    async def _spawn(self, extra: list[str]) -> asyncio.subprocess.Process:
+        self.started += 1
+        try:
+            return await asyncio.create_subprocess_exec(
+                *self.argv,
+                *extra,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                cwd=self.workdir,
+                limit=_READ_LIMIT,
+            )
+        except OSError as e:
+            raise ClawdbotError(f"Failed to start Clawdbot: {e}") from e
+
+    async def run(self, command: str, args: dict | None = None, on_output: LinesCallback | None = None) -> dict:
+        """Run an allowlisted command. Raises ClawdbotError on non-zero exit, timeout or overflow."""
+        if command not in CLAW_COMMANDS:
+            raise ClawdbotError(f"Unknown Clawdbot command: {command}")
+        batcher = _LineBatcher(on_output)
+        output = _Output(batcher, self.max_output_bytes)
+        start = time.perf_counter()
+        timed_out = False
+        exit_code: int | None = None
+
+        async with self._slots:
+            timer = asyncio.create_task(batcher.flush_periodically())
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if self.persistent:
+                        exit_code = await self._run_persistent(command, args or {}, output)
+                    else:
+                        exit_code = await self._run_spawned(command, args or {}, output)
+            except TimeoutError:
+                timed_out = True
+            finally:
+                batcher.close()
+                await timer
+                await batcher.flush()
+
+        result = {
+            "command": command,
+            "mode": "persistent" if self.persistent else "spawn",
+            "exit_code": exit_code,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+            "timed_out": timed_out,
+            "truncated": output.truncated,
+            "output_bytes": output.bytes,
+            "output_tail": list(output.tail),
+        }
+        if timed_out:
+            raise ClawdbotError(f"Clawdbot {command} timed out after {self.timeout}s")
+        if output.line_too_long:
+            raise ClawdbotError(f"Clawdbot {command} output line exceeded {_READ_LIMIT} bytes")
+        if output.truncated:
+            raise ClawdbotError(f"Clawdbot {command} exceeded {self.max_output_bytes} output bytes")
+        if exit_code != 0:
+            tail = " | ".join(list(output.tail)[-3:])
+            raise ClawdbotError(f"Clawdbot {command} exited with {exit_code}: {tail}")
+        return result
+
+    async def _run_spawned(self, command: str, args: dict, output: _Output) -> int:
+        proc = await self._spawn([command])
+        try:
+            proc.stdin.write(json.dumps(args).encode() + b"\n")
+            await proc.stdin.drain()
+            proc.stdin.close()
+            try:
+                async for raw in proc.stdout:
+                    if not await output.add(raw.decode("utf-8", "replace").rstrip("\n")):
+                        break
+            except ValueError:  # line over _READ_LIMIT
+                output.overlong_line()
+            if output.truncated:
+                await _kill(proc)
+                return -1
+            return await proc.wait()
+        finally:
+            if proc.returncode is None:
+                await _kill(proc)  # timeout/cancellation
+
+    async def _run_persistent(self, command: str, args: dict, output: _Output) -> int:
+        worker = None
+        while self._idle and worker is None:
+            candidate = self._idle.pop()
+            if candidate.alive:
+                worker = candidate
+                self.reused += 1
+        if worker is None:
+            worker = _PersistentWorker(await self._spawn(self.serve_args))
+
+        healthy = False
+        try:
+            exit_code = await worker.run(command, args, output)
+            healthy = not output.truncated
+            return exit_code
+        finally:
+            if healthy and worker.alive:
+                self._idle.append(worker)
+            else:
+                # Mid-response state is unknown after timeout/overflow/exit: discard the worker
+                await _kill(worker.proc)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for worker in idle:
+            await _kill(worker.proc)
+
+    def snapshot(self) -> dict:
+        return {
+            "mode": "persistent" if self.persistent else "spawn",
+            "size": self.size,
+            "idle_workers": len(self._idle),
+            "processes_started": self.started,
+            "workers_reused": self.reused,
+        }
@@ -0,0 +1,26 @@
+"""Helpers for parsing compact runner settings strings."""
+
+from __future__ import annotations
+
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+def parse_mapping(raw: str | None, cast: Callable[[str], T]) -> dict[str, T]:
+    """Parse "key=value,key=value" (the RUNNER_ALLOWLIST style) into a dict.
+
+    Entries without "=" or whose value fails `cast` are ignored.
+    """
+    mapping: dict[str, T] = {}
+    if not raw:
+        return mapping
+    for item in raw.split(","):
+        key, sep, value = item.partition("=")
+        if not sep or not key.strip():
+            continue
+        try:
+            mapping[key.strip()] = cast(value.strip())
+        except ValueError:
+            continue
+    return mapping
@@ -0,0 +1,37 @@
+"""Per-job context available to handlers while they run.
+
+The runner sets `current_job` before dispatching a handler, so handlers (and helpers
+they call) can append progress to ops_job_events without `dispatch_job` having to
+thread a job_id through every signature.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from runner.lib.admission import AdmissionController
+
+EmitFn = Callable[[str, "str | None", "dict | None"], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class JobContext:
+    job_id: str
+    job_type: str
+    emit: EmitFn
+    # Runner DB sessions for handlers that write their own tables (e.g. nearsight_articles)
+    session_factory: Callable[[], Any] | None = None
+    # Runner admission control, for handlers that dispatch further jobs (workflow steps)
+    admission: AdmissionController | None = None
+
+
+current_job: ContextVar[JobContext | None] = ContextVar("current_job", default=None)
+
+
+async def emit_event(event_type: str, message: str | None = None, data: dict | None = None) -> None:
+    """Record an ops_job_events row for the current job (no-op outside a runner job)."""
+    ctx = current_job.get()
+    if ctx is not None:
+        await ctx.emit(event_type, message, data)
@@ -0,0 +1,93 @@
+"""Five-field cron expressions (minute hour day-of-month month day-of-week).
+
+Supports `*`, lists (`1,15`), ranges (`1-5`), steps (`*/10`, `0-30/5`) and `@hourly`-style
+aliases. Day-of-week is 0-6 with Sunday = 0 (7 is accepted as Sunday). As in Vixie cron,
+when both day-of-month and day-of-week are restricted a day matches if either does;
+a field starting with `*` (e.g. `*/2`) counts as unrestricted, and then both must match.
+All times are naive UTC, matching the ops_* tables.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+# Longest gap between matches is bounded (e.g. Feb 29 on a given weekday); cap the search.
+_MAX_SEARCH_DAYS = 366 * 8
+
+
+class CronError(ValueError):
+    """Invalid cron expression."""
+
+
+def _parse_field(spec: str, name: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in spec.split(","):
+        rng, _, step_str = part.partition("/")
+        try:
+            step = int(step_str) if step_str else 1
+            if rng == "*":
+                start, end = low, high
+            elif "-" in rng:
+                a, b = rng.split("-", 1)
+                start, end = int(a), int(b)
+            else:
+                start = int(rng)
+                end = high if step_str else start
+        except ValueError:
+            raise CronError(f"Invalid {name} field: {spec!r}") from None
+        if step < 1 or start < low or end > high or start > end:
+            raise CronError(f"Out of range {name} field: {spec!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronExpression:
+    def __init__(self, expression: str) -> None:
+        self.expression = expression.strip()
+        fields = ALIASES.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise CronError(f"Expected 5 fields, got {len(fields)}: {expression!r}")
+        parsed = [_parse_field(f, *spec) for f, spec in zip(fields, _FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        self._day_restricted = not fields[2].startswith("*")
+        self._weekday_restricted = not fields[4].startswith("*")
+
+    def _day_matches(self, dt: datetime) -> bool:
+        if dt.month not in self.months:
+            return False
+        dom = dt.day in self.days
+        dow = (dt.isoweekday() % 7) in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return dom or dow
+        # A field starting with "*" (including "*/2") still constrains by its values
+        return dom and dow
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after`."""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(_MAX_SEARCH_DAYS):
+            if self._day_matches(day):
+                for hour in sorted(self.hours):
+                    for minute in sorted(self.minutes):
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise CronError(f"No matching time found for {self.expression!r}")
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
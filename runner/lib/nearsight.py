@@ -0,0 +1,220 @@
+"""Nearsight feed refresh: RSS/Atom parsing, normalization, scoring and dedupe.
+
+The refresh runs as a streaming pipeline (runner.lib.pipeline):
+fetch -> parse -> normalize -> score -> dedupe -> upsert. The functions here are the
+per-item steps; they hold no state besides the Deduper, so they are testable without
+network or database access. Articles are upserted into `nearsight_articles` keyed by
+url_hash, so re-seeing an article across runs refreshes it instead of duplicating it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from xml.etree import ElementTree
+
+from sqlalchemy import text
+
+STAGES = ("fetch", "parse", "normalize", "score", "dedupe", "upsert")
+DEFAULT_CONCURRENCY = {"fetch": 8, "parse": 2, "normalize": 1, "score": 1, "dedupe": 1, "upsert": 1}
+MAX_FEEDS = 500
+MAX_TITLE = 500
+MAX_SUMMARY = 1000
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+UPSERT_SQL = text(
+    """
+    INSERT INTO nearsight_articles
+        (id, url_hash, url, title, summary, source, published_at, score, first_seen_at, last_seen_at)
+    VALUES
+        (gen_random_uuid(), :url_hash, :url, :title, :summary, :source, :published_at, :score,
+         :now, :now)
+    ON CONFLICT (url_hash) DO UPDATE SET
+        title = EXCLUDED.title,
+        summary = EXCLUDED.summary,
+        published_at = COALESCE(EXCLUDED.published_at, nearsight_articles.published_at),
+        score = EXCLUDED.score,
+        last_seen_at = EXCLUDED.last_seen_at
+    """
+)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(value: str | None) -> str:
+    """Plain text from feed HTML: tags stripped, entities decoded, whitespace collapsed."""
+    if not value:
+        return ""
+    return _SPACE_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", value))).strip()
+
+
+def parse_feed(body: bytes, source: str) -> list[dict[str, Any]]:
+    """Raw entries from an RSS 2.0, RSS 1.0 (RDF) or Atom document."""
+    try:
+        root = ElementTree.fromstring(body)
+    except ElementTree.ParseError as e:
+        raise ValueError(f"Invalid feed XML from {source}: {e}") from e
+
+    entries = []
+    for element in root.iter():
+        if _local(element.tag) not in ("item", "entry"):
+            continue
+        entry: dict[str, Any] = {"source": source}
+        for child in element:
+            name = _local(child.tag)
+            if name == "title":
+                entry["title"] = child.text
+            elif name == "link":
+                # Atom: <link rel="alternate" href="..."/>; RSS: <link>url</link>
+                href = child.get("href")
+                if href is None:
+                    entry.setdefault("link", (child.text or "").strip())
+                elif child.get("rel", "alternate") == "alternate":
+                    entry["link"] = href
+            elif name in ("description", "summary") or (name in ("content", "encoded") and "summary" not in entry):
+                entry["summary"] = child.text
+            elif name in ("pubDate", "published", "date") or (name == "updated" and "published" not in entry):
+                entry["published"] = child.text
+        entries.append(entry)
+    return entries
+
+
+def canonical_url(url: str) -> str | None:
+    """Normalize an article URL for dedupe; None if it is not http(s)."""
+    parts = urlsplit((url or "").strip())
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != (443 if scheme == "https" else 80):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def parse_published(value: str | None) -> datetime | None:
+    """RFC 822 (RSS) or ISO 8601 (Atom) timestamp as naive UTC; None if unparseable."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def normalize_entry(entry: dict[str, Any]) -> dict[str, Any] | None:
+    """Clean one raw entry; None if it has no usable title or link."""
+    url = canonical_url(entry.get("link") or "")
+    title = _text(entry.get("title"))[:MAX_TITLE]
+    if not url or not title:
+        return None
+    return {
+        "url": url,
+        "url_hash": hashlib.sha256(url.encode()).hexdigest(),
+        "title": title,
+        "summary": _text(entry.get("summary"))[:MAX_SUMMARY] or None,
+        "source": entry.get("source"),
+        "published_at": parse_published(entry.get("published")),
+    }
+
+
+def parse_keywords(raw: Any) -> dict[str, float]:
+    """Keywords as a list (weight 1) or a {keyword: weight} mapping, lowercased."""
+    if isinstance(raw, dict):
+        return {str(k).lower(): float(v) for k, v in raw.items() if str(k).strip()}
+    return {str(k).lower(): 1.0 for k in raw or [] if str(k).strip()}
+
+
+def score_entry(
+    article: dict[str, Any], keywords: dict[str, float], now: datetime, half_life_hours: float = 24.0
+) -> float:
+    """Keyword relevance (title hits count double) decayed by age.
+
+    Without keywords every article has relevance 1, so the score is recency only.
+    Articles without a publish date are treated as one half-life old.
+    """
+    if keywords:
+        title = article["title"].lower()
+        summary = (article.get("summary") or "").lower()
+        relevance = sum(w * (2 * (kw in title) + (kw in summary)) for kw, w in keywords.items())
+    else:
+        relevance = 1.0
+    published = article.get("published_at")
+    age_hours = max((now - published).total_seconds() / 3600, 0.0) if published else half_life_hours
+    return round(relevance * 0.5 ** (age_hours / half_life_hours), 4)
+
+
+class Deduper:
+    """Drops articles already seen in this run by canonical URL or normalized title.
+
+    Holds one hash per unique article, not the articles themselves.
+    """
+
+    def __init__(self) -> None:
+        self._seen: set[str] = set()
+        self.dropped = 0
+
+    def is_new(self, article: dict[str, Any]) -> bool:
+        title_key = "t:" + hashlib.sha256(article["title"].lower().encode()).hexdigest()
+        keys = ("u:" + article["url_hash"], title_key)
+        if any(k in self._seen for k in keys):
+            self.dropped += 1
+            return False
+        self._seen.update(keys)
+        return True
+
+
+def refresh_failure(stage_stats: dict[str, dict], feed_count: int) -> str | None:
+    """Why a refresh run must fail, from its pipeline stage stats; None if it succeeded.
+
+    A run fails when no feed could be fetched and parsed, or when any upsert batch
+    failed (those articles were not stored). Single bad feeds are only reported.
+    """
+    feed_errors = stage_stats["fetch"]["errors"] + stage_stats["parse"]["errors"]
+    if feed_count and feed_errors >= feed_count:
+        samples = stage_stats["fetch"]["error_samples"] + stage_stats["parse"]["error_samples"]
+        return f"All {feed_count} feeds failed: {'; '.join(samples)}"
+    upsert = stage_stats.get("upsert")
+    if upsert and upsert["errors"]:
+        return f"{upsert['errors']} upsert batches failed: {'; '.join(upsert['error_samples'])}"
+    return None
+
+
+def upsert_articles(session_factory, articles: list[dict[str, Any]]) -> int:
+    """Upsert one batch in a single transaction; returns the number of rows written."""
+    if not articles:
+        return 0
+    now = datetime.utcnow()
+    rows = [{**a, "now": now} for a in articles]
+    db = session_factory()
+    try:
+        db.execute(UPSERT_SQL, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return len(rows)
@@ -0,0 +1,196 @@
+"""Bounded-memory streaming pipelines of async stages.
+
+Items flow source -> stage 1 -> ... -> stage N through bounded asyncio queues. A stage
+function is an async generator called once per input item (or per list of up to
+`batch_size` items) that yields zero or more outputs, so one shape covers map, filter
+and fan-out. A worker whose downstream queue is full blocks on put(), which stops it
+draining its own input queue: backpressure reaches the source, and the number of items
+buffered is bounded by the queue sizes whatever the input size.
+
+Each stage runs `concurrency` workers, so stages overlap and slow stages can be
+widened independently. An exception for one item is counted in that stage's stats
+(with a few samples) and the item is dropped; the rest of the run continues.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+
+StageFn = Callable[[Any], AsyncIterator[Any]]
+SinkFn = Callable[[Any], Awaitable[None]]
+
+MAX_ERROR_SAMPLES = 3
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: StageFn
+    concurrency: int = 1
+    # Capacity of this stage's input queue
+    queue_size: int = 64
+    # > 1: fn receives a list of up to batch_size items already waiting in the queue
+    batch_size: int = 1
+
+
+@dataclass
+class StageStats:
+    name: str
+    concurrency: int
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    error_samples: list[str] = field(default_factory=list)
+    busy_seconds: float = 0.0
+    # Time items sat in this stage's input queue
+    queue_wait_seconds: float = 0.0
+    # Time workers were blocked handing outputs downstream (backpressure)
+    output_wait_seconds: float = 0.0
+    max_queue_depth: int = 0
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    def as_dict(self, origin: float) -> dict:
+        active = (self.finished_at or origin) - (self.started_at or origin)
+        return {
+            "concurrency": self.concurrency,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "error_samples": self.error_samples,
+            "busy_ms": round(self.busy_seconds * 1000, 3),
+            "queue_wait_ms": round(self.queue_wait_seconds * 1000, 3),
+            "queue_wait_ms_avg": (
+                round(self.queue_wait_seconds * 1000 / self.items_in, 3) if self.items_in else 0.0
+            ),
+            "output_wait_ms": round(self.output_wait_seconds * 1000, 3),
+            "max_queue_depth": self.max_queue_depth,
+            # Relative to pipeline start: overlapping windows show stages running concurrently
+            "started_ms": round(((self.started_at or origin) - origin) * 1000, 3),
+            "finished_ms": round(((self.finished_at or origin) - origin) * 1000, 3),
+            "items_per_second": round(self.items_in / active, 2) if active > 0 else None,
+        }
+
+
+async def _iterate(source: Iterable | AsyncIterable) -> AsyncIterator[Any]:
+    if hasattr(source, "__aiter__"):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def run_pipeline(
+    source: Iterable | AsyncIterable,
+    stages: list[Stage],
+    sink: SinkFn | None = None,
+) -> dict:
+    """Stream `source` through `stages`; outputs of the last stage go to `sink`.
+
+    Returns wall time, source item count and per-stage stats (keyed by stage name).
+    """
+    if not stages:
+        raise ValueError("Pipeline requires at least one stage")
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Pipeline stage names must be unique")
+
+    origin = time.perf_counter()
+    inboxes = [asyncio.Queue(maxsize=max(1, s.queue_size)) for s in stages]
+    stats = [StageStats(s.name, max(1, s.concurrency)) for s in stages]
+    remaining = [st.concurrency for st in stats]
+    source_items = 0
+
+    async def put(index: int, item: Any) -> None:
+        inbox = inboxes[index]
+        await inbox.put((time.perf_counter(), item))
+        stats[index].max_queue_depth = max(stats[index].max_queue_depth, inbox.qsize())
+
+    async def close(index: int) -> None:
+        for _ in range(stats[index].concurrency):
+            await inboxes[index].put((time.perf_counter(), _DONE))
+
+    async def feed() -> None:
+        nonlocal source_items
+        async for item in _iterate(source):
+            source_items += 1
+            await put(0, item)
+        await close(0)
+
+    async def emit(index: int, item: Any) -> float:
+        """Hand one output downstream; returns the seconds spent blocked."""
+        stats[index].items_out += 1
+        start = time.perf_counter()
+        if index + 1 < len(stages):
+            await put(index + 1, item)
+        elif sink is not None:
+            await sink(item)
+        return time.perf_counter() - start
+
+    async def process(index: int, value: Any) -> None:
+        stat = stats[index]
+        start = time.perf_counter()
+        blocked = 0.0
+        try:
+            async for out in stages[index].fn(value):
+                blocked += await emit(index, out)
+        except Exception as e:
+            stat.errors += 1
+            if len(stat.error_samples) < MAX_ERROR_SAMPLES:
+                message = " ".join(str(e).split())[:120]
+                stat.error_samples.append(f"{type(e).__name__}: {message}")
+        stat.output_wait_seconds += blocked
+        stat.busy_seconds += time.perf_counter() - start - blocked
+
+    async def take(index: int) -> Any:
+        enqueued, item = await inboxes[index].get()
+        if item is not _DONE:
+            stats[index].items_in += 1
+            stats[index].queue_wait_seconds += time.perf_counter() - enqueued
+        return item
+
+    async def worker(index: int) -> None:
+        stage, stat, inbox = stages[index], stats[index], inboxes[index]
+        while True:
+            item = await take(index)
+            if item is _DONE:
+                break
+            if stat.started_at is None:
+                stat.started_at = time.perf_counter()
+            if stage.batch_size <= 1:
+                await process(index, item)
+                continue
+            # Batch whatever is already queued; never wait to fill a batch
+            batch, done = [item], False
+            while len(batch) < stage.batch_size and not inbox.empty():
+                nxt = await take(index)
+                if nxt is _DONE:
+                    done = True
+                    break
+                batch.append(nxt)
+            await process(index, batch)
+            if done:
+                break
+
+        remaining[index] -= 1
+        if remaining[index] == 0:
+            stat.finished_at = time.perf_counter()
+            if index + 1 < len(stages):
+                await close(index + 1)
+
+    async with asyncio.TaskGroup() as group:
+        group.create_task(feed())
+        for index, stat in enumerate(stats):
+            for _ in range(stat.concurrency):
+                group.create_task(worker(index))
+
+    return {
+        "wall_ms": round((time.perf_counter() - origin) * 1000, 3),
+        "source_items": source_items,
+        "stages": {stat.name: stat.as_dict(origin) for stat in stats},
+    }
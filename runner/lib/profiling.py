@@ -0,0 +1,108 @@
+"""Opt-in per-job profiling (cProfile + tracemalloc).
+
+A job is profiled when its payload sets `"_profile": true` or when it is sampled by
+RUNNER_PROFILE_SAMPLE_RATES. Only one job is profiled at a time: cProfile and
+tracemalloc are process-wide, so a second candidate simply runs unprofiled.
+When profiling is off, the only cost is the `should_profile` check.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import pstats
+import random
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable
+
+from runner.lib.config import parse_mapping
+
+PROFILE_PAYLOAD_FLAG = "_profile"
+PROFILE_EVENT = "profile"
+_PROFILE_ATTR = "_runner_profile"
+
+_profile_lock = asyncio.Lock()
+
+
+def parse_sample_rates(raw: str | None) -> dict[str, float]:
+    """Parse "job_type=rate,..." (rate in 0..1). Invalid entries are ignored."""
+    return {k: v for k, v in parse_mapping(raw, float).items() if 0.0 < v <= 1.0}
+
+
+def should_profile(job_type: str, payload: dict | None, rates: dict[str, float]) -> bool:
+    if payload and payload.get(PROFILE_PAYLOAD_FLAG) is True:
+        return True
+    rate = rates.get(job_type)
+    return rate is not None and random.random() < rate
+
+
+def summarize_stats(profiler: cProfile.Profile, top_n: int) -> list[dict[str, Any]]:
+    """Top-N functions by cumulative time."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, lineno, funcname), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{filename}:{lineno}({funcname})",
+                "ncalls": nc,
+                "primitive_calls": cc,
+                "tottime_ms": round(tt * 1000, 3),
+                "cumtime_ms": round(ct * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return rows[:top_n]
+
+
+async def run_profiled(
+    run: Callable[[], Awaitable[Any]], top_n: int = 20
+) -> tuple[Any, dict[str, Any] | None]:
+    """Await `run()` under cProfile/tracemalloc.
+
+    Returns (result, summary). Summary is None if another job is already being profiled.
+    If `run()` raises, the summary is attached to the exception (see `profile_of`) so
+    failing jobs are profiled too. The profile covers the event-loop thread, so
+    concurrently running jobs may appear in the hotspots; worker threads/processes are
+    not captured.
+    """
+    if _profile_lock.locked():
+        return await run(), None
+
+    async with _profile_lock:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        error: BaseException | None = None
+        profiler.enable()
+        try:
+            result = await run()
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            profiler.disable()
+            wall_ms = (time.perf_counter() - start) * 1000
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+            summary = {
+                "wall_ms": round(wall_ms, 3),
+                "peak_memory_bytes": max(peak - baseline, 0),
+                "top": summarize_stats(profiler, top_n),
+                "scope": "event_loop_thread",
+                "outcome": "succeeded" if error is None else "failed",
+            }
+            if error is not None:
+                setattr(error, _PROFILE_ATTR, summary)
+        return result, summary
+
+
+def profile_of(error: BaseException) -> dict[str, Any] | None:
+    """Profile summary of a job whose profiled run raised `error`, if any."""
+    return getattr(error, _PROFILE_ATTR, None)
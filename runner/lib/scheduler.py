@@ -0,0 +1,204 @@
+"""Recurring job scheduler that runs inside the runner.
+
+Schedules and last-run state live in `ops_schedules`. Each poll claims due rows with
+`FOR UPDATE SKIP LOCKED` and advances `next_run_at` in the same transaction, so when
+several runners are deployed each tick fires on exactly one of them.
+
+Overlap handling (per schedule):
+- "skip": while the previous run is still queued/running the tick is dropped.
+- "coalesce": the tick stays due and fires once as soon as the previous run finishes,
+  so any number of missed ticks collapse into a single run.
+
+Jitter: `next_run_at` is pushed back by a random 0..jitter_seconds so schedules sharing
+a cron expression don't all fire in the same poll.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import text
+
+from runner.lib.cron import CronError, CronExpression
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+OVERLAP_POLICIES = ("skip", "coalesce")
+
+FireCallback = Callable[[str, str, dict], Awaitable[None]]
+
+
+def next_fire_time(cron: CronExpression, now: datetime, jitter_seconds: int) -> datetime:
+    jitter = random.uniform(0, jitter_seconds) if jitter_seconds > 0 else 0.0
+    return cron.next_after(now) + timedelta(seconds=jitter)
+
+
+class Scheduler:
+    """Polls ops_schedules and fires due jobs through `fire(job_id, job_type, payload)`."""
+
+    def __init__(
+        self,
+        session_factory,
+        fire: FireCallback,
+        poll_seconds: float = 15.0,
+        batch_size: int = 20,
+        stale_after_seconds: int = 6 * 3600,
+    ) -> None:
+        self.session_factory = session_factory
+        self.fire = fire
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        # A run whose row has not been updated for this long no longer blocks its schedule
+        self.stale_after = timedelta(seconds=stale_after_seconds)
+        self.ticks = 0
+        self.fired = 0
+        self.skipped = 0
+        self.last_tick_at: datetime | None = None
+        self.last_error: str | None = None
+
+    async def run_forever(self) -> None:
+        while True:
+            try:
+                await self.tick()
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # keep the loop alive; surface via status()
+                self.last_error = str(e)[:500]
+                logger.exception("Scheduler tick failed")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def tick(self) -> list[dict]:
+        """Claim due schedules, create their ops_jobs rows, then fire them."""
+        now = datetime.utcnow()
+        due = await asyncio.to_thread(self._claim_due, now)
+        self.ticks += 1
+        self.last_tick_at = now
+        for job in due:
+            await self.fire(job["job_id"], job["job_type"], job["payload"])
+        self.fired += len(due)
+        return due
+
+    def status(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "fired": self.fired,
+            "skipped": self.skipped,
+            "last_tick_at": self.last_tick_at.isoformat() if self.last_tick_at else None,
+            "last_error": self.last_error,
+        }
+
+    def _claim_due(self, now: datetime) -> list[dict]:
+        db = self.session_factory()
+        fired: list[dict] = []
+        try:
+            rows = db.execute(
+                text(
+                    """
+                    SELECT s.id, s.name, s.job_type, s.cron, s.payload, s.overlap_policy,
+                           s.jitter_seconds, s.next_run_at,
+                           j.status AS last_status, j.updated_at AS last_updated_at
+                    FROM ops_schedules s
+                    LEFT JOIN ops_jobs j ON j.id = s.last_job_id
+                    WHERE s.enabled AND (s.next_run_at IS NULL OR s.next_run_at <= :now)
+                    ORDER BY s.next_run_at NULLS FIRST
+                    LIMIT :limit
+                    FOR UPDATE OF s SKIP LOCKED
+                    """
+                ),
+                {"now": now, "limit": self.batch_size},
+            ).mappings().all()
+
+            for row in rows:
+                job = self._process(db, row, now)
+                if job:
+                    fired.append(job)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return fired
+
+    def _process(self, db, row, now: datetime) -> dict | None:
+        try:
+            cron = CronExpression(row["cron"])
+        except CronError as e:
+            db.execute(
+                text(
+                    "UPDATE ops_schedules SET enabled = false, last_error = :error, updated_at = :now "
+                    "WHERE id = :id"
+                ),
+                {"id": row["id"], "error": str(e)[:500], "now": now},
+            )
+            return None
+
+        next_run_at = next_fire_time(cron, now, row["jitter_seconds"])
+        if row["next_run_at"] is None:
+            # Newly created schedule: wait for its first tick instead of firing immediately
+            self._set_next(db, row["id"], next_run_at, now)
+            return None
+
+        active = (
+            row["last_status"] in ACTIVE_STATUSES
+            and row["last_updated_at"] is not None
+            and now - row["last_updated_at"] < self.stale_after
+        )
+        if active:
+            if row["overlap_policy"] == "coalesce":
+                return None  # stays due; fires once the previous run finishes
+            self.skipped += 1
+            db.execute(
+                text(
+                    "UPDATE ops_schedules SET next_run_at = :next, skipped_count = skipped_count + 1, "
+                    "updated_at = :now WHERE id = :id"
+                ),
+                {"id": row["id"], "next": next_run_at, "now": now},
+            )
+            return None
+
+        job_id = str(uuid.uuid4())
+        payload = row["payload"] or {}
+        db.execute(
+            text(
+                """
+                INSERT INTO ops_jobs (id, job_type, status, requested_by, payload, created_at, updated_at)
+                VALUES (CAST(:id AS uuid), :job_type, 'queued', :requested_by,
+                        CAST(:payload AS jsonb), :now, :now)
+                """
+            ),
+            {
+                "id": job_id,
+                "job_type": row["job_type"],
+                "requested_by": f"scheduler:{row['name']}",
+                "payload": json.dumps(payload),
+                "now": now,
+            },
+        )
+        db.execute(
+            text(
+                """
+                UPDATE ops_schedules
+                SET last_run_at = :now, last_job_id = CAST(:job_id AS uuid), next_run_at = :next,
+                    last_error = NULL, updated_at = :now
+                WHERE id = :id
+                """
+            ),
+            {"id": row["id"], "job_id": job_id, "next": next_run_at, "now": now},
+        )
+        return {"job_id": job_id, "job_type": row["job_type"], "payload": payload, "schedule": row["name"]}
+
+    @staticmethod
+    def _set_next(db, schedule_id, next_run_at: datetime, now: datetime) -> None:
+        db.execute(
+            text("UPDATE ops_schedules SET next_run_at = :next, updated_at = :now WHERE id = :id"),
+            {"id": schedule_id, "next": next_run_at, "now": now},
+        )
@@ -0,0 +1,224 @@
+"""Small DAG workflows executed entirely inside one runner job.
+
+Payload:
+    {
+      "steps": [
+        {"id": "news", "job_type": "nearsight_collect_refresh", "payload": {...}},
+        {"id": "captions", "job_type": "captorator_compose", "depends_on": ["news"],
+         "for_each": "news.candidates", "payload": {...}}
+      ],
+      "max_parallel": 4
+    }
+
+Each step runs as soon as its dependencies succeed. Outputs are passed downstream in
+memory: a step receives `inputs` (dependency id -> result), or with `for_each`
+("<dep_id>.<dotted.path>" to a list in a dependency's result) fans out to one call per
+item with `item`/`item_index`, bounded by `max_parallel`. Only the workflow itself has
+an ops_jobs row; step progress goes to ops_job_events via `emit_event`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from runner.lib.admission import AdmissionController
+from runner.lib.context import emit_event
+
+WORKFLOW_JOB_TYPE = "workflow"
+MAX_STEPS = 20
+MAX_PARALLEL = 16
+MAX_FAN_OUT = 500
+
+DispatchFn = Callable[[str, dict], Awaitable[dict]]
+
+
+class WorkflowError(ValueError):
+    """Invalid workflow spec or failed step."""
+
+
+@dataclass
+class Step:
+    id: str
+    job_type: str
+    payload: dict = field(default_factory=dict)
+    depends_on: list[str] = field(default_factory=list)
+    for_each: str | None = None
+
+
+def parse_workflow(payload: dict) -> tuple[list[Step], int]:
+    """Validate the spec. Returns steps in topological order and max_parallel."""
+    if payload is not None and not isinstance(payload, dict):
+        raise WorkflowError("Workflow payload must be an object")
+    raw_steps = (payload or {}).get("steps")
+    if not isinstance(raw_steps, list) or not raw_steps:
+        raise WorkflowError("Workflow requires a non-empty 'steps' list")
+    if len(raw_steps) > MAX_STEPS:
+        raise WorkflowError(f"Workflow has {len(raw_steps)} steps (max {MAX_STEPS})")
+
+    steps: dict[str, Step] = {}
+    for raw in raw_steps:
+        if not isinstance(raw, dict) or not raw.get("id") or not raw.get("job_type"):
+            raise WorkflowError("Each step requires 'id' and 'job_type'")
+        step_id = str(raw["id"])
+        step_payload = raw.get("payload") or {}
+        depends_on = raw.get("depends_on") or []
+        for_each = raw.get("for_each")
+        if not isinstance(step_payload, dict):
+            raise WorkflowError(f"Step '{step_id}' payload must be an object")
+        if not isinstance(depends_on, list):
+            raise WorkflowError(f"Step '{step_id}' depends_on must be a list")
+        if for_each is not None and not isinstance(for_each, str):
+            raise WorkflowError(f"Step '{step_id}' for_each must be a string")
+        step = Step(
+            id=step_id,
+            job_type=str(raw["job_type"]),
+            payload=dict(step_payload),
+            # Deduplicated (order kept) so repeated entries don't inflate indegree
+            depends_on=list(dict.fromkeys(str(d) for d in depends_on)),
+            for_each=for_each,
+        )
+        if step.id in steps:
+            raise WorkflowError(f"Duplicate step id '{step.id}'")
+        if step.job_type == WORKFLOW_JOB_TYPE:
+            raise WorkflowError("Nested workflows are not supported")
+        steps[step.id] = step
+
+    for step in steps.values():
+        for dep in step.depends_on:
+            if dep not in steps:
+                raise WorkflowError(f"Step '{step.id}' depends on unknown step '{dep}'")
+        if step.for_each is not None:
+            source = str(step.for_each).split(".", 1)[0]
+            if source not in step.depends_on:
+                raise WorkflowError(f"Step '{step.id}' for_each must reference one of its depends_on")
+
+    # Kahn's algorithm: reject cycles and fix a deterministic order
+    indegree = {s.id: len(s.depends_on) for s in steps.values()}
+    ordered: list[Step] = []
+    ready = [sid for sid, deg in indegree.items() if deg == 0]
+    while ready:
+        sid = ready.pop(0)
+        ordered.append(steps[sid])
+        for other in steps.values():
+            if sid in other.depends_on:
+                indegree[other.id] -= 1
+                if indegree[other.id] == 0:
+                    ready.append(other.id)
+    if len(ordered) != len(steps):
+        raise WorkflowError("Workflow steps contain a dependency cycle")
+
+    try:
+        max_parallel = int((payload or {}).get("max_parallel", 4))
+    except (TypeError, ValueError):
+        raise WorkflowError("max_parallel must be an integer") from None
+    return ordered, min(max(max_parallel, 1), MAX_PARALLEL)
+
+
+def _resolve_items(step: Step, results: dict[str, Any]) -> list:
+    source, _, path = str(step.for_each).partition(".")
+    value: Any = results[source]
+    for key in filter(None, path.split(".")):
+        if not isinstance(value, dict) or key not in value:
+            raise WorkflowError(f"for_each path '{step.for_each}' not found in '{source}' result")
+        value = value[key]
+    if not isinstance(value, list):
+        raise WorkflowError(f"for_each path '{step.for_each}' is not a list")
+    if len(value) > MAX_FAN_OUT:
+        raise WorkflowError(f"for_each produced {len(value)} items (max {MAX_FAN_OUT})")
+    return value
+
+
+async def run_workflow(
+    payload: dict, dispatch: DispatchFn, admission: AdmissionController | None = None
+) -> dict:
+    """Run the workflow; raises WorkflowError if any step fails (after others settle).
+
+    With `admission`, every step call takes a slot for its own job type, so per-type
+    caps, priority lanes and the global concurrency limit hold inside workflows too.
+    """
+    steps, max_parallel = parse_workflow(payload)
+    semaphore = asyncio.Semaphore(max_parallel)
+    results: dict[str, Any] = {}
+    summary: dict[str, dict] = {s.id: {"job_type": s.job_type, "status": "pending"} for s in steps}
+    done: dict[str, asyncio.Future] = {
+        s.id: asyncio.get_running_loop().create_future() for s in steps
+    }
+
+    async def call(step: Step, step_payload: dict) -> dict:
+        async with semaphore:
+            if admission is None:
+                return await dispatch(step.job_type, step_payload)
+            # Queued regardless of the lane limit: waiting calls are bounded by max_parallel
+            ticket = admission.admit(step.job_type, force=True)
+            try:
+                await ticket.wait()
+                return await dispatch(step.job_type, step_payload)
+            finally:
+                admission.release(ticket)
+
+    async def run_step(step: Step) -> None:
+        ok = True
+        for dep in step.depends_on:
+            ok = await done[dep] and ok
+        if not ok:
+            summary[step.id]["status"] = "skipped"
+            await emit_event("step_skipped", f"{step.id}: dependency did not succeed", {"step": step.id})
+            done[step.id].set_result(False)
+            return
+
+        start = time.perf_counter()
+        await emit_event("step_started", step.id, {"step": step.id, "job_type": step.job_type})
+        try:
+            inputs = {dep: results[dep] for dep in step.depends_on}
+            if step.for_each is None:
+                results[step.id] = await call(step, {**step.payload, "inputs": inputs})
+                items = None
+            else:
+                fan_out = _resolve_items(step, results)
+                results[step.id] = list(
+                    await asyncio.gather(
+                        *(
+                            call(step, {**step.payload, "item": item, "item_index": i})
+                            for i, item in enumerate(fan_out)
+                        )
+                    )
+                )
+                items = len(fan_out)
+        except Exception as e:
+            duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            summary[step.id].update(status="failed", duration_ms=duration_ms, error=str(e)[:200])
+            await emit_event(
+                "step_failed", f"{step.id}: {str(e)[:200]}", {"step": step.id, "duration_ms": duration_ms}
+            )
+            done[step.id].set_result(False)
+            return
+
+        duration_ms = round((time.perf_counter() - start) * 1000, 3)
+        summary[step.id].update(status="succeeded", duration_ms=duration_ms)
+        data = {"step": step.id, "duration_ms": duration_ms}
+        if items is not None:
+            summary[step.id]["items"] = items
+            data["items"] = items
+        await emit_event("step_succeeded", step.id, data)
+        done[step.id].set_result(True)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_step(s) for s in steps))
+    wall_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    failed = [sid for sid, info in summary.items() if info["status"] == "failed"]
+    if failed:
+        details = "; ".join(f"{sid}: {summary[sid].get('error', '')}" for sid in failed)
+        raise WorkflowError(f"Workflow steps failed ({details})")
+
+    # Leaf step outputs are the workflow's result
+    upstream = {dep for s in steps for dep in s.depends_on}
+    return {
+        "job_type": WORKFLOW_JOB_TYPE,
+        "wall_ms": wall_ms,
+        "steps": summary,
+        "outputs": {s.id: results[s.id] for s in steps if s.id not in upstream},
+    }
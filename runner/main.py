@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import asyncio
-import json
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
 
+import orjson
 from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import Response
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 
+from runner import jobs
 from runner.jobs import dispatch_job
+from runner.lib import metrics, profiling
+from runner.lib.admission import AdmissionController, Overloaded, Ticket
+from runner.lib.config import parse_mapping
+from runner.lib.context import JobContext, current_job
+from runner.lib.workflow import WORKFLOW_JOB_TYPE, WorkflowError, parse_workflow
+from runner.lib.scheduler import Scheduler
 from runner.settings import runner_settings
 
 
@@ -27,9 +36,97 @@ if not DATABASE_URL.startswith("postgresql://"):
 engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+PROFILE_SAMPLE_RATES = profiling.parse_sample_rates(runner_settings.runner_profile_sample_rates)
+
+
+def _record_event(job_id: str, event_type: str, message: str | None, data: dict | None) -> None:
+    """Append a row to ops_job_events (best effort; never fails the job)."""
+    db = SessionLocal()
+    try:
+        db.execute(
+            text(
+                """
+                INSERT INTO ops_job_events (id, job_id, event_type, message, data, created_at)
+                VALUES (gen_random_uuid(), CAST(:job_id AS uuid), :event_type, :message,
+                        CAST(:data AS jsonb), :now)
+                """
+            ),
+            {
+                "job_id": job_id,
+                "event_type": event_type,
+                "message": message,
+                "data": (
+                    orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+                    if data is not None
+                    else None
+                ),
+                "now": datetime.utcnow(),
+            },
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+    finally:
+        db.close()
+
+
+def _mark_failed(job_id: str, error_msg: str) -> None:
+    """Set ops_jobs status=failed with a bounded error (raises if the UPDATE fails)."""
+    db = SessionLocal()
+    try:
+        with metrics.db_update_seconds.time(statement="mark_failed"):
+            db.execute(
+                text(
+                    """
+                    UPDATE ops_jobs
+                    SET status = 'failed', updated_at = :now, error = :error
+                    WHERE id = CAST(:job_id AS uuid)
+                    """
+                ),
+                {
+                    "job_id": job_id,
+                    "now": datetime.utcnow(),
+                    "error": error_msg[:500],
+                },
+            )
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
 
 def create_runner_app() -> FastAPI:
-    app = FastAPI(title="DOMAIN_EXPANSION Runner", version="2.0.0")
+    # Strong references so fire-and-forget job tasks are not garbage collected mid-run
+    background_tasks: set[asyncio.Task] = set()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        scheduler_task = None
+        if runner_settings.scheduler_enabled:
+            app.state.scheduler = Scheduler(
+                SessionLocal,
+                _fire_scheduled,
+                poll_seconds=runner_settings.scheduler_poll_seconds,
+            )
+            scheduler_task = asyncio.create_task(app.state.scheduler.run_forever())
+        yield
+        if scheduler_task:
+            scheduler_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await scheduler_task
+        await jobs.shutdown()
+
+    app = FastAPI(title="DOMAIN_EXPANSION Runner", version="2.0.0", lifespan=lifespan)
+    app.state.scheduler = None
+    admission = AdmissionController(
+        max_concurrency=runner_settings.runner_max_concurrency,
+        job_caps=parse_mapping(runner_settings.runner_job_caps, int),
+        priorities=parse_mapping(runner_settings.runner_job_priorities, str),
+        weights=parse_mapping(runner_settings.runner_priority_weights, int),
+        max_queued=runner_settings.runner_max_queued,
+    )
 
     def require_token(x_runner_token: str | None):
         if not x_runner_token or x_runner_token != runner_settings.runner_token:
@@ -44,10 +141,33 @@ def create_runner_app() -> FastAPI:
                     status_code=403, detail=f"Job type '{job_type}' not in allowlist"
                 )
 
+    def _validate_workflow(payload: dict) -> None:
+        """Reject malformed workflows and disallowed step job types before accepting."""
+        try:
+            steps, _ = parse_workflow(payload)
+        except WorkflowError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        for step in steps:
+            _validate_job_type(step.job_type)
+
     @app.get("/healthz")
-    def healthz(x_runner_token: str | None = Header(default=None)):
+    async def healthz(x_runner_token: str | None = Header(default=None)):
+        # async: admission state is only mutated on the event loop, so snapshot it there
+        require_token(x_runner_token)
+        response = {
+            "status": "ok",
+            "runner_instance": "default",
+            "admission": admission.snapshot(),
+        }
+        if app.state.scheduler is not None:
+            response["scheduler"] = app.state.scheduler.status()
+        return response
+
+    @app.get("/metrics")
+    def metrics_endpoint(x_runner_token: str | None = Header(default=None)):
+        """Prometheus text-format metrics (in-process, no external service)."""
         require_token(x_runner_token)
-        return {"status": "ok", "runner_instance": "default"}
+        return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
     @app.post("/runner/execute")
     async def runner_execute(
@@ -61,6 +181,9 @@ def create_runner_app() -> FastAPI:
         3. Immediately write status=running to ops_jobs
         4. Dispatch job handler in background
         5. Return quickly (job processes async)
+
+        Admission control: if the job's priority lane queue is full, returns 429 with
+        Retry-After instead of queueing without bound (ops_jobs is left untouched).
         """
         require_token(x_runner_token)
 
@@ -74,95 +197,163 @@ def create_runner_app() -> FastAPI:
             )
 
         _validate_job_type(job_type)
+        if job_type == WORKFLOW_JOB_TYPE:
+            _validate_workflow(payload)
 
+        try:
+            ticket = admission.admit(job_type)
+        except Overloaded as e:
+            metrics.jobs_rejected.inc(job_type=job_type)
+            raise HTTPException(
+                status_code=429,
+                detail=f"Runner overloaded ({e.priority} lane full)",
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+        _start_job(job_id, job_type, payload, ticket)
+
+        return {
+            "status": "accepted",
+            "job_id": job_id,
+            "job_type": job_type,
+            "runner_instance": "default",
+        }
+
+    def _start_job(job_id: str, job_type: str, payload: dict, ticket: Ticket) -> None:
+        """Mark the job running and dispatch it in the background once `ticket` is granted."""
         # Update ops_jobs to running immediately
         db = SessionLocal()
         try:
-            db.execute(
-                text(
-                    """
-                    UPDATE ops_jobs
-                    SET status = 'running', updated_at = :now, runner_instance = :instance
-                    WHERE id = :job_id::uuid
-                    """
-                ),
-                {
-                    "job_id": job_id,
-                    "now": datetime.utcnow(),
-                    "instance": "default",
-                },
-            )
-            db.commit()
+            with metrics.db_update_seconds.time(statement="mark_running"):
+                db.execute(
+                    text(
+                        """
+                        UPDATE ops_jobs
+                        SET status = 'running', updated_at = :now, runner_instance = :instance
+                        WHERE id = CAST(:job_id AS uuid)
+                        """
+                    ),
+                    {
+                        "job_id": job_id,
+                        "now": datetime.utcnow(),
+                        "instance": "default",
+                    },
+                )
+                db.commit()
         except Exception as e:
             db.rollback()
+            admission.release(ticket)
             raise HTTPException(status_code=500, detail=f"Failed to update job status: {str(e)}")
         finally:
             db.close()
 
+        metrics.jobs_accepted.inc(job_type=job_type)
+        metrics.jobs_in_flight.inc()
+
         # Dispatch job in background (non-blocking)
-        asyncio.create_task(
-            _execute_job_async(job_id, job_type, payload)
-        )
+        task = asyncio.create_task(_execute_job_async(job_id, job_type, payload, ticket))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
 
-        return {
-            "status": "accepted",
-            "job_id": job_id,
-            "job_type": job_type,
-            "runner_instance": "default",
-        }
+    async def _fire_scheduled(job_id: str, job_type: str, payload: dict) -> None:
+        """Scheduler callback: same path as /runner/execute for a job row it created."""
+        try:
+            _validate_job_type(job_type)
+            if job_type == WORKFLOW_JOB_TYPE:
+                _validate_workflow(payload)
+            _start_job(job_id, job_type, payload, admission.admit(job_type, force=True))
+        except HTTPException as e:
+            _mark_failed(job_id, f"Scheduler could not start job: {e.detail}")
 
-    async def _execute_job_async(job_id: str, job_type: str, payload: dict) -> None:
+    async def _execute_job_async(
+        job_id: str, job_type: str, payload: dict, ticket: Ticket
+    ) -> None:
         """Execute job asynchronously and update ops_jobs on completion.
         
         V2 contract: Bounded result/error sizes, guaranteed update in finally block.
         """
+        async def emit(event_type: str, message: str | None, data: dict | None) -> None:
+            await asyncio.to_thread(_record_event, job_id, event_type, message, data)
+
+        async def record_profile(profile: dict) -> None:
+            message = f"Profiled {job_type} ({profile['wall_ms']} ms, {profile['outcome']})"
+            await emit(profiling.PROFILE_EVENT, message, profile)
+
+        current_job.set(
+            JobContext(
+                job_id=job_id,
+                job_type=job_type,
+                emit=emit,
+                session_factory=SessionLocal,
+                admission=admission,
+            )
+        )
         db = SessionLocal()
         try:
-            result = await dispatch_job(job_type, payload)
-            # Bound result size (max 10KB JSON)
-            result_json = json.dumps(result) if isinstance(result, dict) else json.dumps({"result": result})
+            await ticket.wait()
+            metrics.admission_wait_seconds.observe(
+                ticket.started_at - ticket.queued_at, priority=ticket.priority
+            )
+            if job_type == WORKFLOW_JOB_TYPE:
+                # A workflow only coordinates: each step takes its own slot. Holding the
+                # global slot while steps wait could deadlock (e.g. RUNNER_MAX_CONCURRENCY=1);
+                # detaching keeps the workflow counted against RUNNER_JOB_CAPS until `finally`.
+                admission.detach(ticket)
+            profile = None
+            with metrics.dispatch_seconds.time(job_type=job_type):
+                if profiling.should_profile(job_type, payload, PROFILE_SAMPLE_RATES):
+                    result, profile = await profiling.run_profiled(
+                        lambda: dispatch_job(job_type, payload),
+                        top_n=runner_settings.runner_profile_top_n,
+                    )
+                else:
+                    result = await dispatch_job(job_type, payload)
+            if profile is not None:
+                await record_profile(profile)
+            # Bound result size (max 10KB JSON). Serialized once; the driver gets the
+            # text as-is and Postgres parses it in CAST(... AS jsonb).
+            result_json = orjson.dumps(
+                result if isinstance(result, dict) else {"result": result},
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+            metrics.result_size_bytes.observe(len(result_json), job_type=job_type)
             if len(result_json) > 10000:
-                result_json = json.dumps({"error": "Result too large", "truncated": True})
+                result_json = b'{"error":"Result too large","truncated":true}'
             
             # Update to succeeded
-            db.execute(
-                text(
-                    """
-                    UPDATE ops_jobs
-                    SET status = 'succeeded', updated_at = :now, result = :result::jsonb
-                    WHERE id = :job_id::uuid
-                    """
-                ),
-                {
-                    "job_id": job_id,
-                    "now": datetime.utcnow(),
-                    "result": result_json,
-                },
-            )
-            db.commit()
-        except Exception as e:
-            # Bound error size (max 500 chars)
-            error_msg = str(e)[:500]
-            try:
+            with metrics.db_update_seconds.time(statement="mark_succeeded"):
                 db.execute(
                     text(
                         """
                         UPDATE ops_jobs
-                        SET status = 'failed', updated_at = :now, error = :error
-                        WHERE id = :job_id::uuid
+                        SET status = 'succeeded', updated_at = :now, result = CAST(:result AS jsonb)
+                        WHERE id = CAST(:job_id AS uuid)
                         """
                     ),
                     {
                         "job_id": job_id,
                         "now": datetime.utcnow(),
-                        "error": error_msg,
+                        "result": result_json.decode(),
                     },
                 )
                 db.commit()
-            except Exception as update_error:
-                # If update fails, log but don't raise (we're in error handler already)
+            metrics.jobs_succeeded.inc(job_type=job_type)
+        except Exception as e:
+            metrics.jobs_failed.inc(job_type=job_type)
+            profile = profiling.profile_of(e)
+            if profile is not None:
+                await record_profile(profile)
+            # Bound error size (max 500 chars)
+            error_msg = str(e)[:500]
+            try:
                 db.rollback()
+                _mark_failed(job_id, error_msg)
+            except Exception:
+                # If update fails, don't raise (we're in error handler already)
+                pass
         finally:
+            admission.release(ticket)
+            metrics.jobs_in_flight.dec()
             db.close()
 
     # Legacy endpoint (for backward compatibility)
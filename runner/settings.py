@@ -16,14 +16,55 @@ class RunnerSettings(BaseSettings):
     database_url: AnyUrl = Field(alias="DATABASE_URL")
 
     runner_allowlist: str | None = Field(
-        default="nearsight_collect_refresh,captorator_compose,metrics_refresh",
+        default="nearsight_collect_refresh,captorator_compose,captorator_asset_qc,metrics_refresh,workflow",
         alias="RUNNER_ALLOWLIST",
     )
     runner_db_schema: str = Field(default="public", alias="RUNNER_DB_SCHEMA")
     runner_allowed_origins: str | None = Field(default=None, alias="RUNNER_ALLOWED_ORIGINS")
 
+    # Profiling: "job_type=rate,..." sampling (0..1); payload "_profile": true always profiles
+    runner_profile_sample_rates: str | None = Field(default=None, alias="RUNNER_PROFILE_SAMPLE_RATES")
+    runner_profile_top_n: int = Field(default=20, alias="RUNNER_PROFILE_TOP_N")
+
+    # Admission control: global/per-job-type slots, priority lanes and bounded wait queues
+    runner_max_concurrency: int = Field(default=8, alias="RUNNER_MAX_CONCURRENCY")
+    # "workflow" bounds concurrently running workflows (their steps take their own slots)
+    runner_job_caps: str | None = Field(default="workflow=4", alias="RUNNER_JOB_CAPS")
+    runner_job_priorities: str | None = Field(
+        default=(
+            "captorator_compose=interactive,nearsight_collect_refresh=batch,"
+            "metrics_refresh=batch,captorator_asset_qc=batch"
+        ),
+        alias="RUNNER_JOB_PRIORITIES",
+    )
+    runner_priority_weights: str | None = Field(default=None, alias="RUNNER_PRIORITY_WEIGHTS")
+    runner_max_queued: int = Field(default=32, alias="RUNNER_MAX_QUEUED")
+
+    # Captorator asset QC: files must live under the asset root; analyses cached by content hash
+    runner_asset_root: str | None = Field(default=None, alias="RUNNER_ASSET_ROOT")
+    runner_asset_cache_dir: str | None = Field(default=None, alias="RUNNER_ASSET_CACHE_DIR")
+    runner_asset_qc_workers: int | None = Field(default=None, alias="RUNNER_ASSET_QC_WORKERS")
+
+    # Recurring schedules (ops_schedules) evaluated inside the runner
+    scheduler_enabled: bool = Field(default=False, alias="SCHEDULER_ENABLED")
+    scheduler_poll_seconds: float = Field(default=15.0, alias="SCHEDULER_POLL_SECONDS")
+
     clawdbot_bin: str | None = Field(default=None, alias="CLAWDBOT_BIN")
     clawdbot_workdir: str | None = Field(default=None, alias="CLAWDBOT_WORKDIR")
+    # Set (e.g. "serve --stdio") if the binary supports the persistent JSON-lines protocol
+    clawdbot_serve_args: str | None = Field(default=None, alias="CLAWDBOT_SERVE_ARGS")
+    clawdbot_pool_size: int = Field(default=2, alias="CLAWDBOT_POOL_SIZE")
+    clawdbot_timeout_seconds: float = Field(default=120.0, alias="CLAWDBOT_TIMEOUT_SECONDS")
+    clawdbot_max_output_bytes: int = Field(default=1_000_000, alias="CLAWDBOT_MAX_OUTPUT_BYTES")
+
+    # Nearsight refresh: default feed URLs (comma-separated) when the payload has none
+    nearsight_feeds: str | None = Field(default=None, alias="NEARSIGHT_FEEDS")
+    # Per-stage worker counts, e.g. "fetch=16,parse=2" (stages: fetch, parse, normalize, score, dedupe, upsert)
+    nearsight_stage_concurrency: str | None = Field(default=None, alias="NEARSIGHT_STAGE_CONCURRENCY")
+    nearsight_queue_size: int = Field(default=64, alias="NEARSIGHT_QUEUE_SIZE")
+    nearsight_fetch_timeout_seconds: float = Field(default=15.0, alias="NEARSIGHT_FETCH_TIMEOUT_SECONDS")
+    nearsight_max_feed_bytes: int = Field(default=5_000_000, alias="NEARSIGHT_MAX_FEED_BYTES")
+    nearsight_upsert_batch: int = Field(default=100, alias="NEARSIGHT_UPSERT_BATCH")
 
     @field_validator("database_url")
     @classmethod
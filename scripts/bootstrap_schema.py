@@ -9,13 +9,27 @@ Usage:
 Note: This is for initial setup only. For ongoing migrations, use Alembic.
 """
 
+from sqlalchemy import text
+
 from domain_expansion.app.db.base import Base
 from domain_expansion.app.db.session import get_engine
-from domain_expansion.app.models.ops import OpsJob, OpsJobEvent
+from domain_expansion.app.models.nearsight import NearsightArticle
+from domain_expansion.app.models.ops import OpsJob, OpsJobEvent, OpsSchedule
+
+# Columns/indexes added after the initial release. create_all() does not alter
+# existing tables, so these are applied explicitly (Postgres IF NOT EXISTS keeps them idempotent).
+ADDITIVE_DDL = [
+    "ALTER TABLE ops_jobs ADD COLUMN IF NOT EXISTS payload_hash TEXT",
+    "CREATE INDEX IF NOT EXISTS idx_ops_jobs_type_hash_created "
+    "ON ops_jobs (job_type, payload_hash, created_at)",
+]
 
 if __name__ == "__main__":
     print("Creating tables...")
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for statement in ADDITIVE_DDL:
+            conn.execute(text(statement))
     print("Schema bootstrap complete.")
     print("Note: For ongoing migrations, use Alembic instead of this script.")
@@ -0,0 +1,41 @@
+"""Fake Clawdbot binary for tests.
+
+Spawn mode:  fake_clawdbot.py <command>   (JSON args on stdin)
+Serve mode:  fake_clawdbot.py serve       (JSON-lines protocol, see runner.lib.clawdbot)
+
+Args: lines (int) lines to print, sleep (seconds), exit_code (int), line_size (int).
+"""
+
+import json
+import os
+import sys
+import time
+
+
+def execute(command, args, emit):
+    for i in range(int(args.get("lines", 3))):
+        emit(f"{command} line {i} pid={os.getpid()}" + "x" * int(args.get("line_size", 0)))
+    time.sleep(float(args.get("sleep", 0)))
+    return int(args.get("exit_code", 0))
+
+
+def main():
+    if sys.argv[1:] == ["serve"]:
+        print("fake clawdbot ready", flush=True)
+        for raw in sys.stdin:
+            request = json.loads(raw)
+            rid = request["id"]
+
+            def emit(line):
+                print(json.dumps({"id": rid, "line": line}), flush=True)
+
+            code = execute(request["command"], request["args"], emit)
+            print(json.dumps({"id": rid, "done": True, "exit_code": code}), flush=True)
+        return 0
+
+    args = json.loads(sys.stdin.readline() or "{}")
+    return execute(sys.argv[1], args, lambda line: print(line, flush=True))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from runner.lib.admission import AdmissionController, Overloaded
+
+
+def test_caps_queue_and_overload():
+    async def scenario():
+        ctl = AdmissionController(
+            max_concurrency=2,
+            job_caps={"nearsight_collect_refresh": 1},
+            priorities={"nearsight_collect_refresh": "batch"},
+            max_queued=1,
+        )
+        first = ctl.admit("nearsight_collect_refresh")
+        second = ctl.admit("nearsight_collect_refresh")
+        assert first.granted.done() and not second.granted.done()
+
+        with pytest.raises(Overloaded) as exc:
+            ctl.admit("nearsight_collect_refresh")
+        assert exc.value.retry_after >= 1
+
+        # Other job types still get the free global slot
+        compose = ctl.admit("captorator_compose")
+        assert compose.granted.done()
+
+        ctl.release(first)
+        assert second.granted.done()
+        assert ctl.snapshot()["lanes"]["batch"]["rejected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_weighted_fair_grants():
+    async def scenario():
+        ctl = AdmissionController(
+            max_concurrency=1,
+            priorities={"captorator_compose": "interactive", "metrics_refresh": "batch"},
+            weights={"interactive": 3, "batch": 1},
+            max_queued=100,
+        )
+        holder = ctl.admit("metrics_refresh")
+        waiting = [ctl.admit("metrics_refresh") for _ in range(4)]
+        waiting += [ctl.admit("captorator_compose") for _ in range(6)]
+
+        order = []
+        current = holder
+        for _ in range(8):
+            ctl.release(current)
+            current = next(t for t in waiting if t.granted.done() and t.started_at is not None)
+            waiting.remove(current)
+            order.append(current.priority)
+        # Roughly 3 interactive grants per batch grant, and batch is not starved
+        assert order.count("interactive") == 6
+        assert order.count("batch") == 2
+
+    asyncio.run(scenario())
+
+
+def test_forced_tickets_do_not_fill_the_lane_queue():
+    async def scenario():
+        ctl = AdmissionController(
+            max_concurrency=1, priorities={"captorator_compose": "interactive"}, max_queued=2
+        )
+        holder = ctl.admit("metrics_refresh")
+        # A workflow fan-out queues far more steps than max_queued
+        steps = [ctl.admit("captorator_compose", force=True) for _ in range(40)]
+        direct = ctl.admit("captorator_compose")
+        assert not direct.granted.done()
+        lane = ctl.snapshot()["lanes"]["interactive"]
+        assert lane["queued"] == 41 and lane["queued_forced"] == 40 and lane["rejected"] == 0
+
+        ctl.admit("captorator_compose")
+        with pytest.raises(Overloaded):
+            ctl.admit("captorator_compose")
+
+        ctl.release(holder)
+        assert steps[0].granted.done()
+        assert ctl.snapshot()["lanes"]["interactive"]["queued_forced"] == 39
+
+    asyncio.run(scenario())
+
+
+def test_detached_ticket_keeps_type_cap_only():
+    async def scenario():
+        ctl = AdmissionController(max_concurrency=1, job_caps={"workflow": 1})
+        workflow = ctl.admit("workflow")
+        ctl.detach(workflow)
+        # The global slot is free for other jobs, but a second workflow must wait
+        assert ctl.admit("metrics_refresh").granted.done()
+        second = ctl.admit("workflow")
+        assert not second.granted.done()
+        assert ctl.snapshot()["running_by_job_type"]["workflow"] == 1
+
+        ctl.release(workflow)
+        ctl.release(workflow)  # idempotent
+        assert ctl.snapshot()["running_by_job_type"] == {"metrics_refresh": 1}
+        assert not second.granted.done()  # global slot still held by metrics_refresh
+
+    asyncio.run(scenario())
@@ -0,0 +1,64 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from runner.lib.asset_qc import (  # noqa: E402
+    AnalysisCache,
+    find_duplicates,
+    resolve_assets,
+    run_asset_qc,
+)
+
+
+def _checkerboard(path, size, cell=40):
+    img = Image.new("L", (size, size))
+    img.putdata([255 * (((x // cell) + (y // cell)) % 2) for y in range(size) for x in range(size)])
+    img.convert("RGB").save(path)
+
+
+def test_asset_qc_checks_duplicates_and_cache(tmp_path):
+    _checkerboard(tmp_path / "a.png", 1080)
+    _checkerboard(tmp_path / "copy.png", 1080)
+    Image.new("RGB", (400, 300), (128, 128, 128)).save(tmp_path / "flat.png")
+    files = resolve_assets(str(tmp_path), ["."])
+    cache = AnalysisCache(str(tmp_path / ".cache"))
+
+    async def check():
+        with ThreadPoolExecutor(2) as executor:
+            return await run_asset_qc(files, executor, cache, root=str(tmp_path))
+
+    result = asyncio.run(check())
+    assert result["checked"] == 3 and result["failed"] == 1
+    failure = result["failures"][0]
+    assert failure["path"] == "flat.png"
+    assert {"dimensions", "aspect_ratio", "blur"} <= set(failure["failed"])
+    assert result["duplicates"]["exact"] == [["a.png", "copy.png"]]
+    assert result["throughput"]["decoded"] == 2
+
+    # Fresh in-memory cache, same cache dir: everything comes from disk
+    cache = AnalysisCache(str(tmp_path / ".cache"))
+    again = asyncio.run(check())
+    assert again["throughput"]["cache_hits"] == 3 and again["throughput"]["decoded"] == 0
+
+
+def test_resolve_assets_rejects_escape(tmp_path):
+    with pytest.raises(ValueError):
+        resolve_assets(str(tmp_path), ["../etc/passwd"])
+
+
+def test_find_duplicates_groups_exact_and_perceptual():
+    assets = [
+        {"path": "a.png", "sha256": "s1", "dhash": "ff00"},
+        {"path": "b.png", "sha256": "s1", "dhash": "ff00"},
+        {"path": "c.png", "sha256": "s2", "dhash": "ff01"},  # 1 bit from a/b
+        {"path": "d.png", "sha256": "s3", "dhash": "00ff"},
+        {"path": "e.png", "error": "unreadable"},
+    ]
+    assert find_duplicates(assets, max_distance=2) == {
+        "exact": [["a.png", "b.png"]],
+        "perceptual": [["a.png", "b.png", "c.png"]],
+    }
+    assert find_duplicates(assets, max_distance=0)["perceptual"] == [["a.png", "b.png"]]
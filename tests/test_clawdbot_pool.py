@@ -0,0 +1,109 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from runner.lib.clawdbot import ClawdbotError, ClawdbotPool
+
+FAKE_BIN = [sys.executable, str(Path(__file__).parent / "fixtures" / "fake_clawdbot.py")]
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_spawn_mode_streams_output():
+    batches = []
+
+    async def scenario():
+        pool = ClawdbotPool(FAKE_BIN, timeout=10)
+
+        async def sink(lines):
+            batches.append(lines)
+
+        return await pool.run("schema_drift", {"lines": 5}, on_output=sink)
+
+    result = _run(scenario())
+    assert result["exit_code"] == 0 and result["mode"] == "spawn"
+    streamed = [line for batch in batches for line in batch]
+    assert len(streamed) == 5 and streamed[0].startswith("schema_drift line 0")
+
+
+@pytest.mark.parametrize("serve_args", [None, ["serve"]])
+def test_sparse_output_is_flushed_while_running(serve_args):
+    arrivals = []
+
+    async def scenario():
+        pool = ClawdbotPool(FAKE_BIN, timeout=10, serve_args=serve_args)
+
+        async def sink(lines):
+            arrivals.append((time.perf_counter(), len(lines)))
+
+        try:
+            start = time.perf_counter()
+            await pool.run("schema_drift", {"lines": 3, "sleep": 2}, on_output=sink)
+            return start, time.perf_counter()
+        finally:
+            await pool.close()
+
+    start, end = _run(scenario())
+    # The three lines are printed at once, then the command sleeps for 2 s
+    assert arrivals[0][1] == 3
+    assert arrivals[0][0] - start < 1.5 and end - arrivals[0][0] > 0.5
+
+
+def test_persistent_workers_are_reused():
+    async def scenario():
+        pool = ClawdbotPool(FAKE_BIN, size=1, timeout=10, serve_args=["serve"])
+        try:
+            first = await pool.run("index_intel", {"lines": 2})
+            second = await pool.run("query_audit", {"lines": 2})
+            return first, second, pool.snapshot()
+        finally:
+            await pool.close()
+
+    first, second, snapshot = _run(scenario())
+    pid = first["output_tail"][0].split("pid=")[1]
+    assert second["output_tail"][0].split("pid=")[1] == pid
+    assert snapshot["processes_started"] == 1 and snapshot["workers_reused"] == 1
+
+
+@pytest.mark.parametrize("serve_args", [None, ["serve"]])
+def test_timeout_output_limit_and_exit_code(serve_args):
+    async def scenario():
+        pool = ClawdbotPool(FAKE_BIN, timeout=0.5, max_output_bytes=2000, serve_args=serve_args)
+        try:
+            with pytest.raises(ClawdbotError, match="timed out"):
+                await pool.run("schema_drift", {"lines": 1, "sleep": 5})
+            with pytest.raises(ClawdbotError, match="exceeded"):
+                await pool.run("schema_drift", {"lines": 100, "line_size": 100})
+            with pytest.raises(ClawdbotError, match="exited with 3"):
+                await pool.run("schema_drift", {"lines": 1, "exit_code": 3})
+            with pytest.raises(ClawdbotError, match="Unknown"):
+                await pool.run("rm_rf", {})
+            # Pool is still usable afterwards
+            return await pool.run("schema_drift", {"lines": 1})
+        finally:
+            await pool.close()
+
+    assert _run(scenario())["exit_code"] == 0
+
+
+@pytest.mark.parametrize("serve_args", [None, ["serve"]])
+def test_overlong_line_is_output_overflow(serve_args):
+    async def scenario():
+        pool = ClawdbotPool(FAKE_BIN, size=1, timeout=10, max_output_bytes=10_000_000, serve_args=serve_args)
+        try:
+            with pytest.raises(ClawdbotError, match="output line exceeded"):
+                await pool.run("schema_drift", {"lines": 1, "line_size": 2_000_000})
+            # The worker was discarded; the next command gets a fresh process
+            after = await pool.run("schema_drift", {"lines": 1})
+            return after, pool.snapshot()
+        finally:
+            await pool.close()
+
+    after, snapshot = _run(scenario())
+    assert after["exit_code"] == 0
+    assert snapshot["processes_started"] == 2 and snapshot["workers_reused"] == 0
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+
+from runner.lib.cron import CronError, CronExpression
+
+
+def test_next_after_steps_and_ranges():
+    cron = CronExpression("*/15 9-17 * * 1-5")
+    # Friday 17:50 -> next weekday window is Monday 09:00
+    assert cron.next_after(datetime(2026, 1, 2, 17, 50)) == datetime(2026, 1, 5, 9, 0)
+    assert cron.next_after(datetime(2026, 1, 5, 9, 0)) == datetime(2026, 1, 5, 9, 15)
+
+
+def test_aliases_and_day_or_weekday():
+    assert CronExpression("@hourly").next_after(datetime(2026, 3, 1, 10, 30)) == datetime(2026, 3, 1, 11, 0)
+    # Day-of-month 1 OR Sunday (2026-03-08 is a Sunday)
+    cron = CronExpression("0 0 1 * 0")
+    assert cron.next_after(datetime(2026, 3, 2)) == datetime(2026, 3, 8)
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "60 * * * *", "*/0 * * * *", "a * * * *"])
+def test_invalid_expressions(expr):
+    with pytest.raises(CronError):
+        CronExpression(expr)
+
+
+def test_star_step_fields_are_unrestricted_like_vixie_cron():
+    # "*/2" day-of-month with a weekday: odd days that are Mondays, not odd days OR Mondays
+    cron = CronExpression("0 0 */2 * 1")
+    assert cron.next_after(datetime(2026, 1, 6)) == datetime(2026, 1, 19)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from domain_expansion.app.models.ops import JobStatus, OpsJob, OpsJobEvent
+from domain_expansion.app.routers import ops
+from domain_expansion.app.services import job_reuse
+from domain_expansion.app.services.job_reuse import (
+    find_reusable_job,
+    parse_reuse_ttls,
+    payload_hash,
+    record_reuse_hit,
+)
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    OpsJob.__table__.create(engine)
+    OpsJobEvent.__table__.create(engine)
+    session = sessionmaker(engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_job(db, status, age_seconds=0, job_type="metrics_refresh", key="k", **fields):
+    job = OpsJob(
+        job_type=job_type,
+        status=status,
+        payload_hash=key,
+        created_at=datetime.utcnow() - timedelta(seconds=age_seconds),
+        **fields,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def test_payload_hash_is_canonical():
+    a = payload_hash("metrics_refresh", {"b": 1, "a": [1, 2]})
+    b = payload_hash("metrics_refresh", {"a": [1, 2], "b": 1})
+    assert a == b
+    assert a != payload_hash("captorator_compose", {"a": [1, 2], "b": 1})
+    assert payload_hash("metrics_refresh", None) == payload_hash("metrics_refresh", {})
+
+
+def test_parse_reuse_ttls_ignores_invalid_entries():
+    ttls = parse_reuse_ttls("metrics_refresh=300, captorator_compose = 120,bad,x=abc,y=0")
+    assert ttls == {"metrics_refresh": 300, "captorator_compose": 120}
+    assert parse_reuse_ttls(None) == {}
+
+
+def test_find_reusable_job_filters(db):
+    add_job(db, JobStatus.FAILED, error="boom")
+    add_job(db, JobStatus.RUNNING, error="Cancellation requested by user")
+    add_job(db, JobStatus.SUCCEEDED, age_seconds=600)  # outside the TTL
+    add_job(db, JobStatus.SUCCEEDED, job_type="captorator_compose")
+    add_job(db, JobStatus.SUCCEEDED, key="other")
+    assert find_reusable_job(db, "metrics_refresh", "k", 300) is None
+
+    succeeded = add_job(db, JobStatus.SUCCEEDED, age_seconds=60)
+    assert find_reusable_job(db, "metrics_refresh", "k", 300).id == succeeded.id
+    # The most recent match wins
+    running = add_job(db, JobStatus.RUNNING, age_seconds=5)
+    assert find_reusable_job(db, "metrics_refresh", "k", 300).id == running.id
+
+
+def test_record_reuse_hit_outcomes(db):
+    running = add_job(db, JobStatus.RUNNING)
+    succeeded = add_job(db, JobStatus.SUCCEEDED, key="done")
+    assert record_reuse_hit(db, running, "api") == "attached"
+    assert record_reuse_hit(db, succeeded, None) == "result"
+    db.commit()
+    events = {e.job_id: e for e in db.query(OpsJobEvent).all()}
+    assert events[running.id].event_type == job_reuse.REUSE_HIT_EVENT
+    assert events[running.id].data["outcome"] == "attached"
+    assert events[succeeded.id].data == {
+        "job_type": "metrics_refresh",
+        "outcome": "result",
+        "payload_hash": "done",
+    }
+
+
+def test_trigger_runner_returns_prior_result(db, monkeypatch):
+    monkeypatch.setattr(ops.settings, "runner_enabled", True)
+    monkeypatch.setattr(ops.settings, "runner_url", "http://runner")
+    monkeypatch.setattr(ops.settings, "runner_token_outbound", "token")
+    monkeypatch.setattr(ops.settings, "job_reuse_ttls", "metrics_refresh=300")
+    # pg_advisory_xact_lock is Postgres-only
+    monkeypatch.setattr(job_reuse, "lock_payload_hash", lambda db, key: None)
+
+    payload = {"window": 24}
+    prior = add_job(
+        db,
+        JobStatus.SUCCEEDED,
+        key=payload_hash("metrics_refresh", payload),
+        result={"rows": [1, 2], "status": "ok"},
+    )
+    request = ops.TriggerRunnerRequest(job_type="metrics_refresh", payload=payload)
+    response = asyncio.run(ops.trigger_runner(request, db))
+    assert json.loads(response.body) == {
+        "job_id": str(prior.id),
+        "status": "succeeded",
+        "message": "Reused prior succeeded result",
+        "result": {"rows": [1, 2], "status": "ok"},
+    }
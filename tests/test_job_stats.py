@@ -0,0 +1,60 @@
+import threading
+from datetime import datetime, timedelta
+
+from domain_expansion.app.services.job_stats import TTLCache, fill_buckets
+
+
+def test_ttl_cache_reuses_value_until_expiry():
+    now = [100.0]
+    cache = TTLCache(10, clock=lambda: now[0])
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute("k", compute) == (1, 0.0)
+    now[0] = 105.0
+    assert cache.get_or_compute("k", compute) == (1, 5.0)
+    now[0] = 111.0
+    assert cache.get_or_compute("k", compute) == (2, 0.0)
+    assert TTLCache(0).get_or_compute("k", compute)[0] == 3
+
+
+def test_fill_buckets_is_dense_with_rates():
+    since = datetime(2026, 1, 1, 10, 30)
+    until = since + timedelta(hours=2)
+    start = int((datetime(2026, 1, 1, 11) - datetime(1970, 1, 1)).total_seconds())
+    series = fill_buckets({(start, "succeeded"): 3, (start, "failed"): 1}, since, until, 3600)
+    assert [b["start"] for b in series] == [
+        datetime(2026, 1, 1, 10),
+        datetime(2026, 1, 1, 11),
+        datetime(2026, 1, 1, 12),
+    ]
+    assert series[0]["succeeded"] == series[0]["failed"] == 0
+    assert series[0]["failure_rate"] == 0.0
+    assert series[1]["failure_rate"] == 0.25
+    assert series[1]["throughput_per_minute"] == round(4 / 60, 3)
+
+
+def test_ttl_cache_slow_miss_does_not_block_other_keys():
+    cache = TTLCache(60)
+    cache.get_or_compute("fast", lambda: "cached")
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(cache.get_or_compute("slow", slow)))
+    worker.start()
+    assert started.wait(5)
+    # Hit and miss for other keys complete while "slow" is still computing
+    assert cache.get_or_compute("fast", lambda: "recomputed")[0] == "cached"
+    assert cache.get_or_compute("other", lambda: "other") == ("other", 0.0)
+    release.set()
+    worker.join(5)
+    assert results[0] == ("slow", 0.0)
+    assert cache.get_or_compute("slow", lambda: "again")[0] == "slow"
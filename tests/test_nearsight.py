@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+
+from runner.lib.nearsight import (
+    Deduper,
+    canonical_url,
+    normalize_entry,
+    parse_feed,
+    parse_keywords,
+    refresh_failure,
+    score_entry,
+)
+from runner.lib.pipeline import Stage, run_pipeline
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>Drone &amp; AI launch</title><link>https://WWW.Example.com/a/?utm_source=x&amp;id=2</link>
+<description>&lt;p&gt;New  drone&lt;/p&gt;</description><pubDate>Mon, 05 Jan 2026 10:00:00 GMT</pubDate></item>
+<item><title></title><link>https://example.com/empty</link></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom</title>
+<entry><title>Atom post</title><link rel="alternate" href="https://example.org/post#top"/>
+<summary>Body</summary><updated>2026-01-05T12:00:00+02:00</updated></entry>
+</feed>"""
+
+
+def test_parse_and_normalize_rss_and_atom():
+    rss = [normalize_entry(e) for e in parse_feed(RSS, "rss")]
+    assert rss[1] is None  # no title
+    article = rss[0]
+    assert article["url"] == "https://www.example.com/a?id=2"
+    assert article["title"] == "Drone & AI launch"
+    assert article["summary"] == "New drone"
+    assert article["published_at"] == datetime(2026, 1, 5, 10, 0)
+
+    atom = normalize_entry(parse_feed(ATOM, "atom")[0])
+    assert atom["url"] == "https://example.org/post"
+    assert atom["published_at"] == datetime(2026, 1, 5, 10, 0)
+
+
+def test_canonical_url_rejects_non_http():
+    assert canonical_url("javascript:alert(1)") is None
+    assert canonical_url("http://Example.com:80/x/") == "http://example.com/x"
+
+
+def test_score_and_dedupe():
+    now = datetime(2026, 1, 6, 10, 0)
+    article = {"title": "Drone launch", "summary": "drone news", "published_at": datetime(2026, 1, 5, 10, 0)}
+    assert score_entry(article, parse_keywords(["drone"]), now, half_life_hours=24) == 1.5
+    assert score_entry(article, {}, now, half_life_hours=24) == 0.5
+
+    deduper = Deduper()
+    first = {"url_hash": "a", "title": "Same Title"}
+    assert deduper.is_new(first)
+    assert not deduper.is_new({"url_hash": "b", "title": "same title"})
+    assert not deduper.is_new({"url_hash": "a", "title": "Other"})
+    assert deduper.dropped == 2
+
+
+def _refresh_stats(bodies: dict[str, bytes | None], upsert_fails: bool = False) -> dict:
+    async def fetch(url):
+        if bodies[url] is None:
+            raise ConnectionError(f"unreachable {url}")
+        yield {"source": url, "body": bodies[url]}
+
+    async def parse(feed):
+        for entry in parse_feed(feed["body"], feed["source"]):
+            yield entry
+
+    async def upsert(batch):
+        if upsert_fails:
+            raise ConnectionError("database is down")
+        for entry in batch:
+            yield entry
+
+    stages = [Stage("fetch", fetch), Stage("parse", parse), Stage("upsert", upsert, batch_size=10)]
+    return asyncio.run(run_pipeline(list(bodies), stages))["stages"]
+
+
+def test_refresh_failure():
+    # One bad feed out of two is reported in the result, not a failure
+    assert refresh_failure(_refresh_stats({"https://a/rss": RSS, "https://b/rss": None}), 2) is None
+
+    message = refresh_failure(_refresh_stats({"https://a/rss": b"<not xml", "https://b/rss": None}), 2)
+    assert message.startswith("All 2 feeds failed")
+    assert "unreachable https://b/rss" in message and "ValueError" in message
+
+    message = refresh_failure(_refresh_stats({"https://a/rss": RSS}, upsert_fails=True), 1)
+    assert message == "1 upsert batches failed: ConnectionError: database is down"
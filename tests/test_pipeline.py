@@ -0,0 +1,82 @@
+import asyncio
+
+from runner.lib.pipeline import Stage, run_pipeline
+
+
+def test_stages_map_filter_fan_out_and_count_errors():
+    async def split(n):
+        yield n
+        yield n + 1000
+
+    async def evens(n):
+        if n == 7:
+            raise ValueError("bad item")
+        if n % 2 == 0:
+            yield n
+
+    async def scenario():
+        out = []
+
+        async def sink(item):
+            out.append(item)
+
+        stats = await run_pipeline(
+            range(20),
+            [Stage("split", split, concurrency=3), Stage("evens", evens, concurrency=2)],
+            sink=sink,
+        )
+        return out, stats
+
+    out, stats = asyncio.run(scenario())
+    assert sorted(out) == sorted([n for n in range(20) if n % 2 == 0] + [n + 1000 for n in range(20) if n % 2 == 0])
+    assert stats["source_items"] == 20
+    assert stats["stages"]["split"]["items_out"] == 40
+    assert stats["stages"]["evens"]["items_in"] == 40
+    assert stats["stages"]["evens"]["errors"] == 1
+    assert stats["stages"]["evens"]["error_samples"] == ["ValueError: bad item"]
+
+
+def test_backpressure_bounds_buffered_items():
+    produced = 0
+    consumed = 0
+    peak = 0
+
+    def source():
+        nonlocal produced, peak
+        for n in range(200):
+            produced += 1
+            peak = max(peak, produced - consumed)
+            yield n
+
+    async def passthrough(n):
+        yield n
+
+    async def slow(n):
+        await asyncio.sleep(0)
+        yield n
+
+    async def sink(_):
+        nonlocal consumed
+        consumed += 1
+        await asyncio.sleep(0.001)
+
+    stages = [Stage("fast", passthrough, queue_size=4), Stage("slow", slow, queue_size=4)]
+    stats = asyncio.run(run_pipeline(source(), stages, sink=sink))
+    assert consumed == 200
+    # Two queues of 4 plus one item in each worker and the source
+    assert peak <= 4 + 4 + 3
+    assert stats["stages"]["slow"]["max_queue_depth"] <= 4
+    assert stats["stages"]["fast"]["output_wait_ms"] > 0
+
+
+def test_batches_only_take_what_is_queued():
+    sizes = []
+
+    async def batch_fn(batch):
+        sizes.append(len(batch))
+        for item in batch:
+            yield item
+
+    stats = asyncio.run(run_pipeline(range(25), [Stage("batch", batch_fn, batch_size=10, queue_size=50)]))
+    assert sum(sizes) == 25 and max(sizes) <= 10
+    assert stats["stages"]["batch"]["items_in"] == 25
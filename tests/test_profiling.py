@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from runner.lib import profiling
+
+
+def test_parse_sample_rates_ignores_invalid_entries():
+    rates = profiling.parse_sample_rates("metrics_refresh=0.5, captorator_compose=1,x=0,y=1.5,z=abc,bad")
+    assert rates == {"metrics_refresh": 0.5, "captorator_compose": 1.0}
+    assert profiling.parse_sample_rates(None) == {}
+
+
+def test_should_profile_flag_and_rates(monkeypatch):
+    assert profiling.should_profile("metrics_refresh", {"_profile": True}, {})
+    assert not profiling.should_profile("metrics_refresh", {"_profile": "yes"}, {})
+    assert not profiling.should_profile("metrics_refresh", None, {"captorator_compose": 1.0})
+    assert profiling.should_profile("captorator_compose", None, {"captorator_compose": 1.0})
+    monkeypatch.setattr(profiling.random, "random", lambda: 0.7)
+    assert not profiling.should_profile("metrics_refresh", {}, {"metrics_refresh": 0.5})
+
+
+def test_concurrent_job_runs_unprofiled():
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "slow"
+
+        async def fast():
+            return "fast"
+
+        first = asyncio.create_task(profiling.run_profiled(slow))
+        await asyncio.sleep(0)
+        second = await profiling.run_profiled(fast)
+        release.set()
+        return await first, second
+
+    (slow_result, slow_profile), (fast_result, fast_profile) = asyncio.run(scenario())
+    assert slow_result == "slow" and slow_profile["outcome"] == "succeeded"
+    assert fast_result == "fast" and fast_profile is None
+
+
+def test_failed_run_keeps_profile():
+    async def boom():
+        raise RuntimeError("handler failed")
+
+    with pytest.raises(RuntimeError) as exc:
+        asyncio.run(profiling.run_profiled(boom))
+    profile = profiling.profile_of(exc.value)
+    assert profile["outcome"] == "failed"
+    assert profile["wall_ms"] >= 0
+    assert profiling.profile_of(RuntimeError("unprofiled")) is None
@@ -0,0 +1,18 @@
+import json
+import uuid
+from datetime import datetime
+
+from domain_expansion.app.responses import OrjsonResponse, raw_json
+
+
+def test_orjson_response_serializes_native_types():
+    job_id = uuid.uuid4()
+    body = json.loads(OrjsonResponse({"id": job_id, "created_at": datetime(2026, 1, 2, 3, 4, 5)}).body)
+    assert body == {"id": str(job_id), "created_at": "2026-01-02T03:04:05"}
+
+
+def test_raw_json_embeds_text_unchanged():
+    stored = '{"b": [1, 2], "a": {"x": null}}'
+    body = OrjsonResponse({"result": raw_json(stored), "payload": raw_json(None)}).body
+    assert stored.encode() in body
+    assert json.loads(body) == {"result": {"b": [1, 2], "a": {"x": None}}, "payload": None}
@@ -0,0 +1,21 @@
+from runner.lib.metrics import Registry
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    accepted = registry.counter("jobs_total", "Jobs.", ("job_type",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("job_type",), buckets=(0.1, 1.0))
+
+    accepted.inc(job_type="metrics_refresh")
+    accepted.inc(job_type="metrics_refresh")
+    latency.observe(0.05, job_type="metrics_refresh")
+    latency.observe(0.5, job_type="metrics_refresh")
+    latency.observe(5, job_type="metrics_refresh")
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{job_type="metrics_refresh"} 2' in text
+    assert 'latency_seconds_bucket{job_type="metrics_refresh",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{job_type="metrics_refresh",le="1"} 2' in text
+    assert 'latency_seconds_bucket{job_type="metrics_refresh",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{job_type="metrics_refresh"} 3' in text
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from runner.lib.scheduler import Scheduler
+
+NOW = datetime(2026, 3, 2, 12, 0)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows=(), fail_on=None):
+        self.rows = list(rows)
+        self.fail_on = fail_on
+        self.statements = []
+        self.committed = self.rolled_back = self.closed = False
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("db error")
+        self.statements.append((sql, params))
+        return FakeResult(self.rows if sql.startswith("SELECT") else [])
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+def schedule(**overrides):
+    row = {
+        "id": "s1",
+        "name": "hourly-metrics",
+        "job_type": "metrics_refresh",
+        "cron": "0 * * * *",
+        "payload": {"window": 24},
+        "overlap_policy": "skip",
+        "jitter_seconds": 0,
+        "next_run_at": NOW - timedelta(minutes=1),
+        "last_status": None,
+        "last_updated_at": None,
+    }
+    row.update(overrides)
+    return row
+
+
+async def _noop_fire(job_id, job_type, payload):
+    return None
+
+
+def make_scheduler():
+    return Scheduler(lambda: FakeSession(), _noop_fire)
+
+
+def test_due_schedule_creates_job_and_advances():
+    db = FakeSession()
+    job = make_scheduler()._process(db, schedule(), NOW)
+    assert job["job_type"] == "metrics_refresh" and job["payload"] == {"window": 24}
+    insert, update = db.statements
+    assert insert[0].startswith("INSERT INTO ops_jobs")
+    assert insert[1]["requested_by"] == "scheduler:hourly-metrics"
+    assert update[1]["next"] == datetime(2026, 3, 2, 13, 0)
+    assert update[1]["job_id"] == job["job_id"]
+
+
+def test_new_schedule_waits_for_first_tick():
+    db = FakeSession()
+    assert make_scheduler()._process(db, schedule(next_run_at=None), NOW) is None
+    [(sql, params)] = db.statements
+    assert "SET next_run_at" in sql and params["next"] == datetime(2026, 3, 2, 13, 0)
+
+
+def test_skip_and_coalesce_while_previous_run_active():
+    running = {"last_status": "running", "last_updated_at": NOW - timedelta(minutes=5)}
+    scheduler = make_scheduler()
+
+    db = FakeSession()
+    assert scheduler._process(db, schedule(**running), NOW) is None
+    [(sql, params)] = db.statements
+    assert "skipped_count = skipped_count + 1" in sql
+    assert scheduler.skipped == 1
+
+    db = FakeSession()
+    assert scheduler._process(db, schedule(overlap_policy="coalesce", **running), NOW) is None
+    assert db.statements == []  # stays due
+
+
+def test_stale_previous_run_does_not_block():
+    stale = {"last_status": "running", "last_updated_at": NOW - timedelta(hours=7)}
+    assert make_scheduler()._process(FakeSession(), schedule(**stale), NOW) is not None
+
+
+def test_invalid_cron_disables_schedule():
+    db = FakeSession()
+    assert make_scheduler()._process(db, schedule(cron="bad"), NOW) is None
+    [(sql, params)] = db.statements
+    assert "enabled = false" in sql and "Expected 5 fields" in params["error"]
+
+
+def test_tick_claims_commits_and_fires():
+    fired = []
+    db = FakeSession(rows=[schedule(), schedule(id="s2", name="new", next_run_at=None)])
+
+    async def fire(job_id, job_type, payload):
+        fired.append((job_id, job_type))
+
+    due = asyncio.run(Scheduler(lambda: db, fire).tick())
+    assert [job["schedule"] for job in due] == ["hourly-metrics"]
+    assert fired == [(due[0]["job_id"], "metrics_refresh")]
+    assert db.statements[0][0].endswith("FOR UPDATE OF s SKIP LOCKED")
+    assert db.committed and db.closed
+
+
+def test_claim_rolls_back_on_error():
+    db = FakeSession(rows=[schedule()], fail_on="INSERT INTO ops_jobs")
+    with pytest.raises(RuntimeError):
+        Scheduler(lambda: db, _noop_fire)._claim_due(NOW)
+    assert db.rolled_back and not db.committed and db.closed
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from runner.lib.admission import AdmissionController
+from runner.lib.workflow import WorkflowError, parse_workflow, run_workflow
+
+
+async def fake_dispatch(job_type: str, payload: dict) -> dict:
+    if job_type == "nearsight_collect_refresh":
+        return {"candidates": [{"title": "a"}, {"title": "b"}, {"title": "c"}]}
+    if job_type == "captorator_compose":
+        if payload["item"]["title"] == "boom":
+            raise RuntimeError("compose failed")
+        return {"caption": payload["item"]["title"].upper()}
+    raise ValueError(f"Unknown job type: {job_type}")
+
+
+def test_fan_out_passes_outputs_downstream():
+    spec = {
+        "steps": [
+            {"id": "captions", "job_type": "captorator_compose", "depends_on": ["news"],
+             "for_each": "news.candidates"},
+            {"id": "news", "job_type": "nearsight_collect_refresh"},
+        ]
+    }
+    result = asyncio.run(run_workflow(spec, fake_dispatch))
+    assert result["outputs"] == {"captions": [{"caption": "A"}, {"caption": "B"}, {"caption": "C"}]}
+    assert result["steps"]["captions"]["items"] == 3
+    assert result["steps"]["news"]["status"] == "succeeded"
+
+
+def test_failed_step_skips_dependents():
+    async def dispatch(job_type, payload):
+        if job_type == "nearsight_collect_refresh":
+            return {"candidates": [{"title": "boom"}]}
+        return await fake_dispatch(job_type, payload)
+
+    spec = {
+        "steps": [
+            {"id": "news", "job_type": "nearsight_collect_refresh"},
+            {"id": "captions", "job_type": "captorator_compose", "depends_on": ["news"],
+             "for_each": "news.candidates"},
+            {"id": "after", "job_type": "metrics_refresh", "depends_on": ["captions"]},
+        ]
+    }
+    with pytest.raises(WorkflowError, match="captions"):
+        asyncio.run(run_workflow(spec, dispatch))
+
+
+@pytest.mark.parametrize(
+    "steps",
+    [
+        [],
+        [{"id": "a", "job_type": "x", "depends_on": ["b"]}, {"id": "b", "job_type": "x", "depends_on": ["a"]}],
+        [{"id": "a", "job_type": "x", "depends_on": ["missing"]}],
+        [{"id": "a", "job_type": "workflow"}],
+    ],
+)
+def test_invalid_specs(steps):
+    with pytest.raises(WorkflowError):
+        parse_workflow({"steps": steps})
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"steps": [{"id": "a", "job_type": "x"}], "max_parallel": "lots"},
+        {"steps": [{"id": "a", "job_type": "x", "payload": ["not", "a", "dict"]}]},
+        {"steps": [{"id": "a", "job_type": "x", "depends_on": "b"}]},
+        {"steps": [{"id": "a", "job_type": "x", "for_each": 3}]},
+        ["steps"],
+    ],
+)
+def test_malformed_specs_raise_workflow_error(payload):
+    with pytest.raises(WorkflowError):
+        parse_workflow(payload)
+
+
+def test_duplicate_depends_on_is_not_a_cycle():
+    steps, _ = parse_workflow(
+        {"steps": [{"id": "a", "job_type": "x"}, {"id": "b", "job_type": "x", "depends_on": ["a", "a"]}]}
+    )
+    assert [s.id for s in steps] == ["a", "b"]
+    assert steps[1].depends_on == ["a"]
+
+
+def test_per_type_cap_holds_inside_workflow():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=8, job_caps={"captorator_compose": 1})
+        running = peak = 0
+
+        async def dispatch(job_type, payload):
+            nonlocal running, peak
+            if job_type == "nearsight_collect_refresh":
+                return {"candidates": list(range(6))}
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return {"n": payload["item"]}
+
+        spec = {
+            "max_parallel": 6,
+            "steps": [
+                {"id": "news", "job_type": "nearsight_collect_refresh"},
+                {"id": "captions", "job_type": "captorator_compose", "depends_on": ["news"],
+                 "for_each": "news.candidates"},
+            ],
+        }
+        result = await run_workflow(spec, dispatch, admission=admission)
+        return result, peak, admission.snapshot()
+
+    result, peak, snapshot = asyncio.run(scenario())
+    assert result["steps"]["captions"]["items"] == 6
+    assert peak == 1
+    assert snapshot["running"] == 0 and snapshot["lanes"]["default"]["admitted"] == 7